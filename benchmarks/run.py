@@ -0,0 +1,298 @@
+"""
+Offline benchmarks of jabberwock against the local AXL stand-in server.
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --output new.json --compare results.json
+
+Every benchmark reports the throughput, latency percentiles and the peak memory, both measured in separate runs so
+they do not distort the timings. peak_memory is the peak of the Python heap (tracemalloc). It does not see the memory
+of lxml and libxml2, so every benchmark is also run once in a child process, which reports its peak resident set size
+(peak_rss) and how much the benchmark added to it (rss_delta). The results are written as JSON together with the
+versions and parameters of the run, so runs can be compared.
+
+The schema served by the stand-in is a small synthetic one with only the user operations, the startup timings are
+much lower than with the real AXL schema.
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+try:
+    import resource
+except ImportError:
+    resource = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# requests prefers a CA bundle from the environment over session.verify = False, the stand-in is self-signed
+for variable in ('REQUESTS_CA_BUNDLE', 'CURL_CA_BUNDLE'):
+    os.environ.pop(variable, None)
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import zeep  # noqa: E402
+import jabberwock  # noqa: E402
+from jabberwock.axlhandler import AXLClient  # noqa: E402
+from jabberwock.axlsql import AXLSQL  # noqa: E402
+from jabberwock.ccm.common import User  # noqa: E402
+from jabberwock.configuration import AXLClientSettings, registry  # noqa: E402
+from jabberwock.metrics import percentile  # noqa: E402
+from server import FakeAXL  # noqa: E402
+
+CONFIG = 'benchmark'
+SCHEMA_PATH = os.path.join(HERE, 'schema')
+VERSION = '12.5'
+LIST_TAGS = ['userid', 'firstName', 'lastName']
+
+
+def configure(port, **settings):
+    registry.register(AXLClientSettings(host='127.0.0.1', port=port, username='bench', password='bench',
+                                        version=VERSION, schema_path=SCHEMA_PATH, **settings), CONFIG)
+    AXLSQL.instances.clear()
+    return AXLClient.get_client(CONFIG, recreate=True)
+
+
+class Benchmark(object):
+    """ A benchmark is a function run `repeat` times, returning the number of items it processed.
+    """
+
+    def __init__(self, name, func, repeat, setup=None):
+        self.name = name
+        self.func = func
+        self.repeat = repeat
+        self.setup = setup
+
+    def run(self):
+        if self.setup is not None:
+            self.setup()
+        self.func()
+        latencies, items = list(), 0
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(self.repeat):
+            call = time.perf_counter()
+            items += self.func() or 1
+            latencies.append(time.perf_counter() - call)
+        seconds = time.perf_counter() - start
+        gc.collect()
+        tracemalloc.start()
+        try:
+            self.func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        latencies.sort()
+        return dict(ops=self.repeat, items=items, seconds=seconds,
+                    ops_per_second=self.repeat / seconds, items_per_second=items / seconds,
+                    latency=dict(p50=percentile(latencies, 50), p90=percentile(latencies, 90),
+                                 p99=percentile(latencies, 99), max=latencies[-1]),
+                    peak_memory=peak)
+
+
+def benchmarks(args, port, uuids):
+    snapshot = os.path.join(tempfile.mkdtemp(prefix='jabberwock-bench-'), 'AXLAPI.snapshot')
+
+    def startup():
+        configure(port)
+
+    def startup_snapshot():
+        configure(port, schema_snapshot=snapshot)
+
+    def get():
+        User(uuid=random.choice(uuids), config_name=CONFIG)
+
+    def get_partial():
+        User(uuid=random.choice(uuids), config_name=CONFIG, returns=LIST_TAGS)
+
+    def list_dict():
+        return len(list(User.list({'userid': '%'}, LIST_TAGS, configname=CONFIG)))
+
+    def list_tuple():
+        return len(User.list({'userid': '%'}, LIST_TAGS, configname=CONFIG, form='tuple'))
+
+    def list_obj():
+        return sum(1 for _ in User.list_obj({'userid': '%'}, first=args.list_obj, configname=CONFIG,
+                                            returns=LIST_TAGS))
+
+    def update():
+        user = User(uuid=random.choice(uuids), config_name=CONFIG)
+        user.firstName = 'Bench %d' % random.randrange(1 << 30)
+        user.update()
+
+    def sql():
+        rows = AXLSQL.get_instance(CONFIG).iter_query('SELECT pkid, name, description, tkmodel FROM device '
+                                                      'ORDER BY pkid', chunk_size=args.chunk_size)
+        return sum(1 for _ in rows)
+
+    def sql_key():
+        rows = AXLSQL.get_instance(CONFIG).iter_query('SELECT pkid, name, description, tkmodel FROM device',
+                                                      chunk_size=args.chunk_size, key='pkid')
+        return sum(1 for _ in rows)
+
+    repeat, heavy = args.repeat, args.heavy_repeat
+    return [
+        Benchmark('startup', startup, heavy),
+        Benchmark('startup_snapshot', startup_snapshot, heavy, setup=startup_snapshot),
+        Benchmark('get', get, repeat, setup=startup),
+        Benchmark('get_partial', get_partial, repeat),
+        Benchmark('list', list_dict, heavy),
+        Benchmark('list_tuple', list_tuple, heavy),
+        Benchmark('list_obj', list_obj, heavy),
+        Benchmark('update', update, repeat),
+        Benchmark('sql', sql, heavy),
+        Benchmark('sql_key', sql_key, heavy),
+    ]
+
+
+def _proc_status(field):
+    try:
+        with open('/proc/self/status') as fp:
+            for line in fp:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+
+
+def rss():
+    """ return the current and the peak resident set size of this process in bytes, None where unknown.
+
+        Linux reports both in /proc. Elsewhere only the peak is known
+        (getrusage), the current size is then the peak so far.
+    """
+    current, peak = _proc_status('VmRSS'), _proc_status('VmHWM')
+    if peak is None and resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak if sys.platform == 'darwin' else peak * 1024
+    return (peak if current is None else current), peak
+
+
+def reset_peak_rss():
+    """ start a new peak of the resident set size where the kernel supports it (Linux).
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as fp:
+            fp.write('5')
+    except OSError:
+        pass
+
+
+def measure_rss(args, name, port, uuids):
+    """ run a benchmark once in a child process and return its peak_rss and rss_delta.
+    """
+    command = [sys.executable, os.path.abspath(__file__), '--rss-of', name, '--port', str(port),
+               '--list-obj', str(args.list_obj), '--chunk-size', str(args.chunk_size), '--seed', str(args.seed)]
+    child = subprocess.run(command, input=json.dumps(uuids), capture_output=True, text=True)
+    if child.returncode != 0:
+        print('unable to measure the RSS of %s: %s' % (name, child.stderr.strip().splitlines()[-1:]))
+        return dict(peak_rss=None, rss_delta=None)
+    return json.loads(child.stdout.splitlines()[-1])
+
+
+def rss_child(args):
+    """ run the benchmark args.rss_of once after its setup and print its RSS figures as JSON.
+    """
+    uuids = json.load(sys.stdin)
+    configure(args.port)
+    benchmark = next(b for b in benchmarks(args, args.port, uuids) if b.name == args.rss_of)
+    if benchmark.setup is not None:
+        benchmark.setup()
+    gc.collect()
+    baseline, _ = rss()
+    reset_peak_rss()
+    benchmark.func()
+    _, peak = rss()
+    print(json.dumps(dict(peak_rss=peak, rss_delta=None if peak is None else max(0, peak - baseline))))
+
+
+def _mib(value):
+    return value / 2 ** 20 if value is not None else float('nan')
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=HERE, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return dict(timestamp=datetime.datetime.now(datetime.timezone.utc).isoformat(), commit=commit,
+                python=platform.python_version(), platform=platform.platform(), zeep=zeep.__version__,
+                jabberwock=jabberwock.__version__, parameters=vars(args))
+
+
+def compare(old, new):
+    """ print the change of the main figures of every benchmark present in both runs.
+    """
+    print('\n%-18s %-16s %14s %14s %9s' % ('benchmark', 'figure', 'before', 'after', 'change'))
+    for name, result in new['results'].items():
+        before = old['results'].get(name)
+        if before is None:
+            continue
+        figures = [('ops_per_second', before['ops_per_second'], result['ops_per_second']),
+                   ('latency p50', before['latency']['p50'], result['latency']['p50']),
+                   ('latency p99', before['latency']['p99'], result['latency']['p99']),
+                   ('peak_memory', before['peak_memory'], result['peak_memory']),
+                   ('rss_delta', before.get('rss_delta'), result.get('rss_delta'))]
+        for figure, a, b in figures:
+            if a is None or b is None:
+                continue
+            change = (b - a) / a * 100 if a else 0.0
+            print('%-18s %-16s %14.4f %14.4f %+8.1f%%' % (name, figure, a, b, change))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the jabberwock benchmarks against a local AXL stand-in.')
+    parser.add_argument('--users', type=int, default=10000, help='number of users served by listUser')
+    parser.add_argument('--sql-rows', type=int, default=50000, help='number of rows of the SQL device table')
+    parser.add_argument('--repeat', type=int, default=200, help='repetitions of the single object benchmarks')
+    parser.add_argument('--heavy-repeat', type=int, default=5, help='repetitions of startup, list and SQL')
+    parser.add_argument('--list-obj', type=int, default=2000, help='number of objects built by list_obj')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='chunk size of the SQL benchmarks')
+    parser.add_argument('--only', help='comma separated names of the benchmarks to run')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='compare with the results in this JSON file')
+    parser.add_argument('--rss-of', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    if args.rss_of:
+        rss_child(args)
+        return
+
+    fake = FakeAXL(users=args.users, sql_rows=args.sql_rows)
+    port = fake.start()
+    try:
+        configure(port)
+        uuids = list(fake.users)
+        selected = set(args.only.split(',')) if args.only else None
+        results = dict()
+        for benchmark in benchmarks(args, port, uuids):
+            if selected is not None and benchmark.name not in selected:
+                continue
+            result = results[benchmark.name] = benchmark.run()
+            result.update(measure_rss(args, benchmark.name, port, uuids))
+            print('%-18s %10.1f ops/s %10.1f items/s  p50 %8.2fms  p99 %8.2fms  heap %8.1f MiB  rss +%8.1f MiB' % (
+                benchmark.name, result['ops_per_second'], result['items_per_second'],
+                result['latency']['p50'] * 1000, result['latency']['p99'] * 1000, _mib(result['peak_memory']),
+                _mib(result['rss_delta'])))
+    finally:
+        fake.stop()
+
+    run = dict(metadata=metadata(args), results=results)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(run, fp, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as fp:
+            compare(json.load(fp), run)
+
+
+if __name__ == '__main__':
+    main()
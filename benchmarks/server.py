@@ -0,0 +1,220 @@
+"""
+Local stand-in for the AXL interface of CUCM, used by the benchmarks.
+
+It serves the operations of the synthetic schema in benchmarks/schema over HTTPS with a self-signed certificate
+generated with openssl. The users and SQL rows are generated when the server is created and the responses are
+rendered for every request, like CUCM does.
+"""
+import os
+import re
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import uuid as uuidlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from lxml import etree
+
+NS_SOAP = 'http://schemas.xmlsoap.org/soap/envelope/'
+NS_AXL = 'http://www.cisco.com/AXL/API/12.5'
+ENVELOPE = ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<soapenv:Envelope xmlns:soapenv="%s"><soapenv:Body>%%s</soapenv:Body></soapenv:Envelope>' % NS_SOAP)
+USER_TAGS = ('firstName', 'lastName', 'userid', 'telephoneNumber', 'department')
+REGEX_SKIP_FIRST = re.compile(r'SKIP (\d+) FIRST (\d+)', re.IGNORECASE)
+REGEX_KEY_CHUNK = re.compile(r"FIRST (\d+) \* FROM .* AS chunk(?: WHERE chunk\.pkid > '([^']*)')?", re.IGNORECASE)
+
+
+def _uuid(i):
+    return '{%s}' % str(uuidlib.UUID(int=i)).upper()
+
+
+def _escape(value):
+    return str(value).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _match(value, pattern):
+    if pattern is None:
+        return True
+    if pattern.endswith('%'):
+        return value.startswith(pattern[:-1])
+    return value == pattern
+
+
+def _fault(message):
+    return ('<soapenv:Fault><faultcode>soapenv:Server</faultcode><faultstring>%s</faultstring>'
+            '<detail><axlError><axlcode>-1</axlcode><axlmessage>%s</axlmessage></axlError></detail>'
+            '</soapenv:Fault>' % (_escape(message), _escape(message)))
+
+
+def _response(operation, body):
+    return '<ns:%sResponse xmlns:ns="%s" sequence="1"><return>%s</return></ns:%sResponse>' % (
+        operation, NS_AXL, body, operation)
+
+
+def create_certificate(directory):
+    """ create a self-signed certificate with openssl and return the paths of the certificate and key.
+    """
+    cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'ec', '-pkeyopt', 'ec_paramgen_curve:prime256v1', '-nodes',
+                    '-days', '1', '-subj', '/CN=localhost', '-keyout', key, '-out', cert],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return cert, key
+
+
+class FakeAXL(object):
+    """ AXL stand-in with generated users and SQL rows.
+
+    :param users: Number of users.
+    :param sql_rows: Number of rows of the device table.
+    :param max_rows: Number of rows above which list and SQL responses are rejected as too large, None for no limit.
+    """
+
+    def __init__(self, users=10000, sql_rows=50000, max_rows=None):
+        self.users = {_uuid(i): dict(firstName='First%d' % i, lastName='Last%d' % (i % 97), userid='user%06d' % i,
+                                     telephoneNumber='+4930%06d' % i, department='Department %d' % (i % 13))
+                      for i in range(users)}
+        self.userids = {values['userid']: uuid for (uuid, values) in self.users.items()}
+        self.devices = [(_uuid(i).strip('{}').lower(), 'SEP%012X' % i, 'Phone of user%06d' % (i % max(users, 1)),
+                         str(36000 + i % 20)) for i in range(sql_rows)]
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        self.server = None
+        self.directory = None
+
+    def start(self, host='127.0.0.1', port=0):
+        """ start serving in a background thread and return the port.
+        """
+        self.directory = tempfile.mkdtemp(prefix='jabberwock-bench-')
+        cert, key = create_certificate(self.directory)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        fake = self
+
+        class Handler(AXLRequestHandler):
+            axl = fake
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        return self.server.server_address[1]
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _too_large(self, count):
+        return self.max_rows is not None and count > self.max_rows
+
+    def _find_user(self, request):
+        uuid = request.findtext('uuid')
+        if uuid is None:
+            return self.userids.get(request.findtext('userid'))
+        uuid = '{%s}' % uuid.strip('{}').upper()
+        return uuid if uuid in self.users else None
+
+    def _user(self, uuid, tags=None):
+        values = self.users[uuid]
+        return '<user uuid="%s">%s</user>' % (uuid, ''.join('<%s>%s</%s>' % (tag, _escape(values[tag]), tag)
+                                                          for tag in USER_TAGS if tags is None or tag in tags))
+
+    def getUser(self, request):
+        uuid = self._find_user(request)
+        if uuid is None:
+            return 500, _fault('Item not valid: The specified User was not found')
+        returned = request.find('returnedTags')
+        tags = [e.tag for e in returned] if returned is not None and len(returned) else None
+        return 200, _response('getUser', self._user(uuid, tags))
+
+    def listUser(self, request):
+        criteria = {e.tag: e.text for e in request.find('searchCriteria')}
+        tags = [e.tag for e in request.find('returnedTags')]
+        with self.lock:
+            uuids = [uuid for (uuid, values) in self.users.items()
+                     if all(_match(values.get(tag, ''), pattern) for (tag, pattern) in criteria.items())]
+        skip = int(request.findtext('skip') or 0)
+        first = request.findtext('first')
+        uuids = uuids[skip:skip + int(first)] if first else uuids[skip:]
+        if self._too_large(len(uuids)):
+            return 500, _fault('Query request too large. Total rows matched: %d rows. '
+                               'Suggestive Row Fetch: less than %d rows' % (len(uuids), self.max_rows))
+        return 200, _response('listUser', ''.join(self._user(uuid, tags) for uuid in uuids))
+
+    def updateUser(self, request):
+        uuid = self._find_user(request)
+        if uuid is None:
+            return 500, _fault('Item not valid: The specified User was not found')
+        with self.lock:
+            values = self.users[uuid]
+            for element in request:
+                if element.tag in USER_TAGS:
+                    values[element.tag] = element.text or ''
+        return 200, _response('updateUser', uuid)
+
+    def addUser(self, request):
+        uuid = '{%s}' % str(uuidlib.uuid4()).upper()
+        with self.lock:
+            values = dict.fromkeys(USER_TAGS, '')
+            values.update((e.tag, e.text or '') for e in request.find('user') if e.tag in USER_TAGS)
+            self.users[uuid] = values
+            self.userids[self.users[uuid].get('userid')] = uuid
+        return 200, _response('addUser', uuid)
+
+    def removeUser(self, request):
+        uuid = self._find_user(request)
+        with self.lock:
+            values = self.users.pop(uuid, None)
+            if values is not None:
+                self.userids.pop(values.get('userid'), None)
+        return 200, _response('removeUser', uuid or '')
+
+    def executeSQLQuery(self, request):
+        sql = request.findtext('sql')
+        rows = self.devices
+        match = REGEX_SKIP_FIRST.search(sql)
+        chunk = REGEX_KEY_CHUNK.search(sql)
+        if match:
+            skip, first = int(match.group(1)), int(match.group(2))
+            rows = rows[skip:skip + first]
+        elif chunk:
+            last = chunk.group(2)
+            rows = [row for row in rows if last is None or row[0] > last][:int(chunk.group(1))]
+        if self._too_large(len(rows)):
+            return 500, _fault('Query request too large. Total rows matched: %d rows. '
+                               'Suggestive Row Fetch: less than %d rows' % (len(rows), self.max_rows))
+        body = ''.join('<row><pkid>%s</pkid><name>%s</name><description>%s</description><tkmodel>%s</tkmodel></row>'
+                       % (pkid, name, _escape(description), model) for (pkid, name, description, model) in rows)
+        return 200, _response('executeSQLQuery', body)
+
+    def executeSQLUpdate(self, request):
+        return 200, _response('executeSQLUpdate', '<rowsUpdated>1</rowsUpdated>')
+
+
+class AXLRequestHandler(BaseHTTPRequestHandler):
+
+    axl = None
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        request = etree.fromstring(body).find('{%s}Body' % NS_SOAP)[0]
+        operation = etree.QName(request).localname
+        handler = getattr(self.axl, operation, None)
+        if handler is None:
+            status, content = 500, _fault('Unknown operation %s' % operation)
+        else:
+            status, content = handler(request)
+        data = (ENVELOPE % content).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
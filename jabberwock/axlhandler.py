@@ -1,56 +1,296 @@
 from zeep import Client
+from zeep.exceptions import LookupError as ZeepLookupError
 from zeep.transports import Transport
-from zeep.plugins import HistoryPlugin
 from requests import Session
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 from urllib3 import disable_warnings
 from urllib3.exceptions import InsecureRequestWarning
 from zeep.cache import SqliteCache
+import asyncio
+import logging
+import threading
 import jabberwock
+from jabberwock import metrics, plugins, schema
+
+log = logging.getLogger('jabberwock')
+
+
+class AXLOperation(object):
+    """
+    An AXL operation which is paced and retried by the throttle of its configuration and, if configured, measured
+    by the metrics recorder.
+    """
+
+    def __init__(self, name, operation, throttle, recorder=None):
+        self.name = name
+        self.operation = operation
+        self.throttle = throttle
+        self.recorder = recorder
+
+    def __call__(self, *args, **kwargs):
+        if self.recorder is not None:
+            return self.recorder.call(self.name, self.throttle, self.operation, *args, **kwargs)
+        return self.throttle.call(self.name, self.operation, *args, **kwargs)
+
+    def raw(self, process):
+        """
+        Return a variant of the operation which passes the raw HTTP response to process instead of parsing it with zeep.
+
+        process runs inside the retry loop of the throttle, so a throttling fault raised by it is retried.
+        """
+        operation = self.operation
+
+        def call(*args, **kwargs):
+            with operation._proxy._client.settings(raw_response=True):
+                response = operation(*args, **kwargs)
+            return process(response)
+
+        return AXLOperation(self.name, call, self.throttle, self.recorder)
+
+
+class AsyncAXLOperation(AXLOperation):
+
+    async def __call__(self, *args, **kwargs):
+        if self.recorder is not None:
+            return await self.recorder.acall(self.name, self.throttle, self.operation, *args, **kwargs)
+        return await self.throttle.acall(self.name, self.operation, *args, **kwargs)
 
 
 class AXLClient(Client):
     """
     The AXLClient class sets up the connection to the call manager with methods for configuring UCM
     Tested with environment of Python 3 and zeep.
+
+    The bound AXL service, the type factory and a lookup table of all operations and their request types are
+    resolved once when the client is created and reused for every call.
     """
 
     clients = dict()
+    client_locks = dict()
+    registry_lock = threading.Lock()
     BINDING_NAME = "{http://www.cisco.com/AXLAPIService/}AXLAPIBinding"
+    XSD_NS = 'ns0'
 
     def __init__(self, config_name='default', **kwargs):
         """
         Args:
             config_name: the name of the config file
         """
+        self.config_name = config_name
         self.config = jabberwock.configuration.registry.get(config_name)
+        self.recorder = metrics.Recorder(self.config.metrics, config_name) if self.config.metrics else None
         disable_warnings(InsecureRequestWarning)
-        wsdl = 'file://' + self.config.schema_path + '/' + self.config.version + '/AXLAPI.wsdl'
-        session = Session()
-        session.verify = False
-        session.auth = HTTPBasicAuth(self.config.username, self.config.password)
-        transport = Transport(cache=SqliteCache(), session=session, timeout=60)
-        defaults = dict(wsdl=wsdl, transport=transport, plugins=[HistoryPlugin()], settings=self.config.zeep_settings)
+        transport = self._create_transport()
+        wsdl = self._load_wsdl(transport)
+        defaults = dict(wsdl=wsdl, transport=transport, plugins=plugins.create_plugins(self.config.transport_debugger),
+                        settings=self.config.zeep_settings)
         merged_kwargs = {**defaults, **kwargs}
         super().__init__(**merged_kwargs)
+        address = "https://{host}:{port}/axl/".format(host=self.config.host, port=self.config.port)
+        self.axl = self._create_axl_service(address)
+        self.factory = self.type_factory(self.XSD_NS)
+        self.operations = {name: self._wrap_operation(name, getattr(self.axl, name))
+                           for name in self.axl._binding._operations}
+        self.types = self._resolve_request_types(self.operations)
+        self.metadata = dict()
 
     @property
-    def axl(self):
-        address = "https://{host}:8443/axl/".format(host=self.config.host)
+    def history(self):
+        """
+        Return the debugging plugin selected by the transport_debugger setting, or None.
+        """
+        return next((p for p in self.plugins if isinstance(p, plugins.DEBUG_PLUGINS)), None)
+
+    def _create_transport(self):
+        config = self.config
+        session = Session()
+        session.verify = False
+        session.auth = HTTPBasicAuth(config.username, config.password)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.pool_size, pool_block=config.pool_block)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not config.keep_alive:
+            session.headers['Connection'] = 'close'
+        transport_class = metrics.MeteredTransport if self.recorder is not None else Transport
+        return transport_class(cache=SqliteCache(), session=session, timeout=config.read_timeout,
+                               operation_timeout=(config.connect_timeout, config.read_timeout))
+
+    def _create_axl_service(self, address):
         return self.create_service(self.BINDING_NAME, address)
 
-    @property
-    def factory(self):
-        return self.type_factory('ns0')
+    def _load_wsdl(self, transport):
+        """
+        Return the WSDL location or, if a schema snapshot is configured, the pre-parsed WSDL document.
+
+        A missing or stale snapshot is compiled again from the schema files. If snapshots are not supported by this
+        python or zeep version, the WSDL is parsed as usual. If the snapshot can't be written, the parsed document
+        is used anyway.
+        """
+        schema_path, version = self.config.schema_path, self.config.version
+        location = schema.wsdl_location(schema_path, version)
+        if not self.config.schema_snapshot:
+            return location
+        if not schema.snapshot_supported():
+            log.warning('schema snapshots require python 3.8 and zeep 4.2, parse the WSDL instead')
+            return location
+        path = self.config.schema_snapshot if isinstance(self.config.schema_snapshot, str) else None
+        settings = self.config.zeep_settings
+        document = schema.load_schema(schema_path, version, path=path, transport=transport, settings=settings)
+        if document is None:
+            log.info('compile schema snapshot for version %s' % version)
+            document = schema.parse_schema(schema_path, version, transport=transport, settings=settings)
+            try:
+                schema.write_schema(document, schema_path, version, target=path, transport=transport,
+                                    settings=settings)
+            except Exception as e:
+                log.warning('unable to write the schema snapshot for version %s: %s' % (version, e))
+        return document
+
+    def _wrap_operation(self, name, operation):
+        return AXLOperation(name, operation, self.config.throttle, self.recorder)
+
+    def _resolve_request_types(self, operations):
+        """
+        Return a mapping of request type names (e.g. GetUserReq) to their zeep types for all known operations.
+        """
+        types = dict()
+        for name in operations:
+            type_name = '%s%sReq' % (name[:1].upper(), name[1:])
+            try:
+                types[type_name] = getattr(self.factory, type_name)
+            except ZeepLookupError:
+                continue
+        return types
+
+    def get_operation(self, name):
+        """
+        Return the operation with the given name (e.g. getUser) from the lookup table.
+        """
+        try:
+            return self.operations[name]
+        except KeyError:
+            raise AttributeError('Service has no operation %r' % name)
+
+    def lookup_type(self, name):
+        """
+        Return the type with the given local name (e.g. XUser, UpdateUserReq) of the AXL namespace.
+
+        Types which are not part of the lookup table are resolved once and added to it. Unlike zeep's get_type, which
+        this client keeps unchanged, no qualified name is needed.
+        """
+        try:
+            return self.types[name]
+        except KeyError:
+            return self.types.setdefault(name, getattr(self.factory, name))
 
     @classmethod
     def get_client(cls, config_name='default', recreate=False):
         """ return a single instance of client for each configuration.
+            The client is created only once, even if several threads ask
+            for it at the same time. recreate replaces an existing client.
         """
-        client = None
-        if config_name not in cls.clients or recreate:
-            client = AXLClient(config_name)
-        return cls.clients.setdefault(config_name, client)
+        key = cls._client_key(config_name)
+        client = cls.clients.get(key)
+        if client is not None and client.usable() and not recreate:
+            return client
+        with cls.registry_lock:
+            lock = cls.client_locks.setdefault((cls, config_name), threading.Lock())
+        with lock:
+            client = cls.clients.get(key)
+            if client is None or not client.usable() or recreate:
+                cls._forget_unusable()
+                client = cls(config_name)
+                cls.clients[key] = client
+            return client
+
+    @classmethod
+    def _client_key(cls, config_name):
+        return config_name
+
+    @classmethod
+    def _forget_unusable(cls):
+        for key, client in list(cls.clients.items()):
+            if not client.usable():
+                del cls.clients[key]
+
+    def usable(self):
+        """
+        Return True if this client can still be used.
+        """
+        return True
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class AsyncAXLClient(AXLClient):
+    """
+    Asynchronous variant of the AXLClient based on zeep's AsyncTransport (requires httpx).
+
+    All operations of this client return coroutines. The parsed WSDL document is shared with the synchronous client
+    of the same configuration, so the schema is only loaded once per process. The HTTP connections belong to an
+    event loop, so get_client returns a client per configuration and running event loop. Clients of closed event
+    loops are replaced.
+
+    Attributes:
+        loop: The event loop the client was created in, None if it was created outside of an event loop.
+    """
+
+    clients = dict()
+
+    def __init__(self, config_name='default', **kwargs):
+        self.loop = _running_loop()
+        super().__init__(config_name, **kwargs)
+
+    @classmethod
+    def _client_key(cls, config_name):
+        loop = _running_loop()
+        return config_name if loop is None else (config_name, id(loop))
+
+    def usable(self):
+        return self.loop is None or not self.loop.is_closed()
+
+    def _create_transport(self):
+        try:
+            import httpx
+            from zeep.transports import AsyncTransport
+        except ImportError:
+            raise ImportError('the async client requires zeep>=4 and httpx, '
+                              'install it with "pip install jabberwock[async]"')
+        config = self.config
+        auth = (config.username, config.password)
+        timeout = httpx.Timeout(config.read_timeout, connect=config.connect_timeout)
+        limits = httpx.Limits(max_connections=config.pool_size,
+                              max_keepalive_connections=config.pool_size if config.keep_alive else 0)
+        transport_class = metrics.MeteredAsyncTransport if self.recorder is not None else AsyncTransport
+        return transport_class(client=httpx.AsyncClient(auth=auth, verify=False, timeout=timeout, limits=limits),
+                              wsdl_client=httpx.Client(auth=auth, verify=False, timeout=timeout),
+                              cache=SqliteCache())
+
+    def _load_wsdl(self, transport):
+        return AXLClient.get_client(self.config_name).wsdl
+
+    def _create_axl_service(self, address):
+        from zeep.proxy import AsyncServiceProxy
+        binding = self.wsdl.bindings[self.BINDING_NAME]
+        return AsyncServiceProxy(self, binding, address=address)
+
+    def _wrap_operation(self, name, operation):
+        return AsyncAXLOperation(name, operation, self.config.throttle, self.recorder)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type=None, exc_value=None, traceback=None):
+        await self.aclose()
 
 
 def main():
@@ -1,22 +1,126 @@
+import functools
 import logging
+import re
+import threading
+from zeep.exceptions import Fault
+from jabberwock import parsing
 from jabberwock import utils
-from jabberwock.axlhandler import AXLClient
+from jabberwock.axlhandler import AXLClient, AsyncAXLClient
 
 log = logging.getLogger('jabberwock')
 
+REGEX_SELECT = re.compile(r'^\s*SELECT\s+', re.IGNORECASE)
+REGEX_ORDER_BY = re.compile(r'\bORDER\s+BY\b', re.IGNORECASE)
+REGEX_PARAMETER = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|(?<!:):([A-Za-z_]\w*)")
+
+
+def sql_literal(value):
+    """ return a value as escaped Informix SQL literal.
+        Strings are quoted, bools become 't'/'f' and lists, tuples and
+        sets become a comma separated list of literals (for IN).
+    """
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return "'t'" if value else "'f'"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        if not value:
+            raise ValueError('an empty list can not be used in SQL')
+        return ', '.join(sql_literal(v) for v in value)
+    value = str(value)
+    if '\x00' in value:
+        raise ValueError('SQL values must not contain NUL characters')
+    return "'%s'" % value.replace("'", "''")
+
+
+@functools.lru_cache(maxsize=256)
+def compile_query(template):
+    """ split a query template into its literal parts and the names of its :name parameters.
+        Quoted strings are kept as they are, so 'a:b' is no parameter.
+        Templates are compiled once and cached.
+    """
+    literals, names, start = [], [], 0
+    for match in REGEX_PARAMETER.finditer(template):
+        if match.group(1) is None:
+            continue
+        literals.append(template[start:match.start()])
+        names.append(match.group(1))
+        start = match.end()
+    literals.append(template[start:])
+    return tuple(literals), tuple(names)
+
+
+def render_query(template, **params):
+    """ return the SQL of a template with all :name parameters replaced by escaped literals.
+    """
+    literals, names = compile_query(template)
+    sql = [literals[0]]
+    for name, literal in zip(names, literals[1:]):
+        try:
+            value = params[name]
+        except KeyError:
+            raise ValueError('missing SQL parameter %r' % name)
+        sql.append(sql_literal(value))
+        sql.append(literal)
+    return ''.join(sql)
+
 
 class AXLSQL(object):
 
+    IN_BATCH_SIZE = 500
+    instances = dict()
+    instances_lock = threading.Lock()
+
     def __init__(self, configname):
-        self.client = AXLClient.get_client(configname)
+        self.configname = configname
+
+    @property
+    def client(self):
+        return AXLClient.get_client(self.configname)
+
+    @classmethod
+    def get_instance(cls, configname='default'):
+        """ return a single instance for each configuration.
+        """
+        key = (cls, configname)
+        instance = cls.instances.get(key)
+        if instance is None:
+            with cls.instances_lock:
+                instance = cls.instances.setdefault(key, cls(configname))
+        return instance
 
     def _exec(self, sql):
         log.info('Execute SqlQuery "%s"' % sql)
-        return self.client.axl.executeSQLQuery(sql)
+        return self.client.get_operation('executeSQLQuery')(sql)
 
     def _exec_update(self, sql):
         log.info('Execute SqlUpdate "%s"' % sql)
-        return self.client.axl.executeSQLUpdate(sql)
+        return self.client.get_operation('executeSQLUpdate')(sql)
+
+    def _exec_rows(self, sql):
+        """ execute a query and return the list of its rows, parsed from the raw response
+            in the process pool of the configuration (parse_processes).
+            The rows are parsed within the call, so throttling and metrics include the parsing.
+        """
+        log.info('Execute SqlQuery "%s"' % sql)
+        client = self.client
+        operation = client.get_operation('executeSQLQuery')
+
+        def process(response):
+            parsing.raise_for_fault(client, operation.name, response)
+            return list(parsing.iter_rows_parallel(response.content, 'row', None, client.config.parse_processes))
+
+        return operation.raw(process)(sql)
+
+    async def _aexec(self, sql):
+        log.info('Execute SqlQuery "%s"' % sql)
+        return await AsyncAXLClient.get_client(self.configname).get_operation('executeSQLQuery')(sql)
+
+    async def _aexec_update(self, sql):
+        log.info('Execute SqlUpdate "%s"' % sql)
+        return await AsyncAXLClient.get_client(self.configname).get_operation('executeSQLUpdate')(sql)
 
     def _gen_result(self, dom_or_part, ispart=False):
         if not ispart:
@@ -30,6 +134,52 @@ class AXLSQL(object):
             dom_or_part = li[0]
         return {x.tag: x.text for x in dom_or_part}
 
+    def query(self, template, **params):
+        """ execute a query template with escaped :name parameters and yield the rows.
+
+            e.g. query('SELECT * FROM device WHERE name = :name', name='SEP001122334455')
+        """
+        return self._gen_result_list(self._exec(render_query(template, **params)))
+
+    def query_one(self, template, **params):
+        """ execute a query template and return its only row or None.
+        """
+        return self._gen_result(self._exec(render_query(template, **params)))
+
+    def query_in(self, template, column, keys, **params):
+        """ execute a query template for many keys at once and return the rows by key.
+
+            The :keys parameter of the template is bound to batches of
+            IN_BATCH_SIZE keys, so many single key lookups need only one
+            query per batch. The rows are split back by the value of column.
+
+        :param template: Query template with a IN (:keys) condition.
+        :param column: Column of the result that contains the key.
+        :param keys: The keys, as returned by CUCM in column (e.g. uuids in lower case without {}).
+        :return: Dictionary of every key and the list of its rows.
+        """
+        keys = list(dict.fromkeys(keys))
+        result = {key: [] for key in keys}
+        for start in range(0, len(keys), self.IN_BATCH_SIZE):
+            for row in self.query(template, keys=keys[start:start + self.IN_BATCH_SIZE], **params) or ():
+                result.setdefault(row[column], []).append(row)
+        return result
+
+    def update(self, template, **params):
+        """ execute an update template with escaped :name parameters.
+        """
+        return self._exec_update(render_query(template, **params))
+
+    async def aquery(self, template, **params):
+        """ asynchronous variant of query, return the list of rows.
+        """
+        return list(self._gen_result_list(await self._aexec(render_query(template, **params))))
+
+    async def aupdate(self, template, **params):
+        """ asynchronous variant of update.
+        """
+        return await self._aexec_update(render_query(template, **params))
+
     def _gen_result_list(self, dom):
         if not dom['return']:
             return None
@@ -38,76 +188,169 @@ class AXLSQL(object):
         for part in dom['return']['row']:
             yield self._gen_result(part, True)
 
-    def _to_bool(self, value):
-        return 't' if bool(value) else 'f'
+    def iter_query(self, sql, chunk_size=5000, key=None, types=None):
+        """ execute a query in chunks and yield the rows as dictionaries.
+
+            Without key the chunks are fetched with SKIP/FIRST. Every chunk
+            runs the query again, so it must have an ORDER BY clause on
+            unique columns, otherwise rows are skipped or returned twice;
+            a query without ORDER BY raises ValueError. With key the chunks
+            are fetched by ranges of this column, which must be unique and
+            part of the result (e.g. pkid). If CUCM rejects a chunk as too
+            large, the chunk size is reduced. With parse_processes in the
+            configuration, large chunks are parsed in a process pool.
+
+        :param sql: The SELECT statement.
+        :param chunk_size: The number of rows fetched with one query.
+        :param key: Name of a unique column to split the query by.
+        :param types: Dictionary of column names and Python types (bool, int, float or any callable).
+        :yield: The rows of the query.
+        """
+        skip, last = 0, None
+        processes = self.client.config.parse_processes
+        while True:
+            chunk_sql = self._chunk_sql(sql, chunk_size, skip, key, last)
+            try:
+                rows = self._exec_rows(chunk_sql) if processes else self._gen_result_list(self._exec(chunk_sql))
+            except Fault as fault:
+                smaller = utils.reduced_page_size(fault, chunk_size)
+                if smaller is None:
+                    raise
+                log.debug('query result too large, reduce chunk size from %s to %s' % (chunk_size, smaller))
+                chunk_size = smaller
+                continue
+            count, row = 0, None
+            for row in rows or ():
+                count += 1
+                yield self._decode_row(row, types) if types else row
+            rows = None
+            if count < chunk_size:
+                return
+            skip += count
+            if key is not None:
+                last = row[key]
+
+    def _chunk_sql(self, sql, chunk_size, skip, key=None, last=None):
+        if key is None:
+            if not REGEX_SELECT.match(sql):
+                raise ValueError('only SELECT statements can be split into chunks')
+            if not REGEX_ORDER_BY.search(sql):
+                raise ValueError('SKIP/FIRST chunks need an ORDER BY clause, add one or pass a unique key column')
+            return REGEX_SELECT.sub('SELECT SKIP %d FIRST %d ' % (skip, chunk_size), sql, count=1)
+        condition = '' if last is None else ' WHERE chunk.%s > %s' % (key, self._quote(last))
+        return 'SELECT FIRST %d * FROM (%s) AS chunk%s ORDER BY chunk.%s' % (chunk_size, sql, condition, key)
+
+    def _decode_row(self, row, types):
+        return {column: self._decode(value, types.get(column)) for (column, value) in row.items()}
+
+    def _decode(self, value, type_):
+        if value is None or type_ is None:
+            return value
+        if type_ is bool:
+            return value.lower() in ('t', 'true', '1')
+        return type_(value)
+
+    def _quote(self, value):
+        return sql_literal(str(value))
 
 
 class AXLSQLUtils(AXLSQL):
+    """ SQL queries for settings that are not available through AXL.
+
+        The *_many variants look up many keys with one query per
+        IN_BATCH_SIZE keys and return the results by key, the keys are the
+        uuids in lower case without {}.
+    """
 
     def user_phone_association(self, fkenduser):
-        sql = 'SELECT * FROM enduserdevicemap WHERE fkenduser="%(fkenduser)s"'
-        return self._gen_result_list(self._exec(sql % dict(fkenduser=utils.uuid(fkenduser))))
+        return self.query('SELECT * FROM enduserdevicemap WHERE fkenduser = :fkenduser',
+                          fkenduser=utils.uuid(fkenduser))
+
+    def user_phone_association_many(self, fkendusers):
+        return self.query_in('SELECT * FROM enduserdevicemap WHERE fkenduser IN (:keys)', 'fkenduser',
+                             [utils.uuid(i) for i in fkendusers])
 
     def number_user_association(self, fknumplan):
-        sql = 'SELECT * FROM endusernumplanmap WHERE fknumplan="%(fknumplan)s"'
-        return self._gen_result_list(self._exec(sql % dict(fknumplan=utils.uuid(fknumplan))))
+        return self.query('SELECT * FROM endusernumplanmap WHERE fknumplan = :fknumplan',
+                          fknumplan=utils.uuid(fknumplan))
+
+    def number_user_association_many(self, fknumplans):
+        return self.query_in('SELECT * FROM endusernumplanmap WHERE fknumplan IN (:keys)', 'fknumplan',
+                             [utils.uuid(i) for i in fknumplans])
 
     def number_device_association(self, fknumplan):
         sql = ('SELECT d.name, d.pkid, n.dnorpattern AS dn FROM device AS d, '
                'numplan AS n, '
                'devicenumplanmap AS dnpm '
-               'WHERE dnpm.fkdevice = d.pkid AND dnpm.fknumplan = n.pkid AND dnpm.fknumplan="%(fknumplan)s"')
-        return self._gen_result_list(self._exec(sql % dict(fknumplan=utils.uuid(fknumplan))))
+               'WHERE dnpm.fkdevice = d.pkid AND dnpm.fknumplan = n.pkid AND dnpm.fknumplan = :fknumplan')
+        return self.query(sql, fknumplan=utils.uuid(fknumplan))
+
+    def number_device_association_many(self, fknumplans):
+        sql = ('SELECT dnpm.fknumplan, d.name, d.pkid, n.dnorpattern AS dn FROM device AS d, '
+               'numplan AS n, '
+               'devicenumplanmap AS dnpm '
+               'WHERE dnpm.fkdevice = d.pkid AND dnpm.fknumplan = n.pkid AND dnpm.fknumplan IN (:keys)')
+        return self.query_in(sql, 'fknumplan', [utils.uuid(i) for i in fknumplans])
 
     def has_cups_cupc(self, fkenduser):
-        sql = 'SELECT * FROM enduserlicense WHERE fkenduser="%(fkenduser)s"'
-        return self._gen_result(self._exec(sql % dict(fkenduser=utils.uuid(fkenduser))))
+        return self.query_one('SELECT * FROM enduserlicense WHERE fkenduser = :fkenduser',
+                              fkenduser=utils.uuid(fkenduser))
+
+    def has_cups_cupc_many(self, fkendusers):
+        result = self.query_in('SELECT * FROM enduserlicense WHERE fkenduser IN (:keys)', 'fkenduser',
+                               [utils.uuid(i) for i in fkendusers])
+        return {key: rows[0] if rows else None for (key, rows) in result.items()}
 
     def insert_cups(self, fkenduser, cupc):
-        sql = 'INSERT INTO enduserlicense (fkenduser, enablecups, enablecupc) VALUES ("%(fkenduser)s", "t", "%(cupc)s")'
-        self._exec_update(sql % dict(fkenduser=utils.uuid(fkenduser), cupc=self._tobool(cupc)))
+        self.update("INSERT INTO enduserlicense (fkenduser, enablecups, enablecupc) VALUES (:fkenduser, 't', :cupc)",
+                    fkenduser=utils.uuid(fkenduser), cupc=bool(cupc))
 
     def remove_cups(self, fkenduser):
-        sql = 'DELETE FROM enduserlicense WHERE fkenduser = "%(fkenduser)s"'
-        self._exec_update(sql % dict(fkenduser=utils.uuid(fkenduser)))
+        self.update('DELETE FROM enduserlicense WHERE fkenduser = :fkenduser', fkenduser=utils.uuid(fkenduser))
 
     def update_cups(self, fkenduser, cupc):
-        sql = 'UPDATE enduserlicense SET enablecupc = "%(cupc)s" WHERE fkenduser = "%(fkenduser)s"'
-        self._exec_update(sql % dict(fkenduser=utils.uuid(fkenduser), cupc=self._tobool(cupc)))
+        self.update('UPDATE enduserlicense SET enablecupc = :cupc WHERE fkenduser = :fkenduser',
+                    fkenduser=utils.uuid(fkenduser), cupc=bool(cupc))
 
     def update_bfcp(self, fkenduser, bfcp):
-        sql = 'UPDATE device SET enablebfcp = "%(bfcp)s" WHERE pkid = "%(fkenduser)s"'
-        self._exec_update(sql % dict(fkenduser=utils.uuid(fkenduser), bfcp=self._tobool(bfcp)))
+        self.update('UPDATE device SET enablebfcp = :bfcp WHERE pkid = :fkenduser',
+                    fkenduser=utils.uuid(fkenduser), bfcp=bool(bfcp))
 
     def set_single_number_reach(self, fkremotedestination, value):
-        sql = ('UPDATE remotedestinationdynamic SET enablesinglenumberreach = "%(value)s" '
-               'WHERE fkremotedestination = "%(fkremotedestination)s"')
-        self._exec_update(sql % dict(fkremotedestination=utils.uuid(fkremotedestination), value=self._tobool(value)))
+        self.update('UPDATE remotedestinationdynamic SET enablesinglenumberreach = :value '
+                    'WHERE fkremotedestination = :fkremotedestination',
+                    fkremotedestination=utils.uuid(fkremotedestination), value=bool(value))
 
     def get_single_number_reach(self, fkremotedestination):
-        sql = ('SELECT enablesinglenumberreach FROM remotedestinationdynamic '
-               'WHERE fkremotedestination = "%(fkremotedestination)s"')
-        return self._gen_result(self._exec(sql % dict(fkremotedestination=utils.uuid(fkremotedestination))))
+        return self.query_one('SELECT enablesinglenumberreach FROM remotedestinationdynamic '
+                              'WHERE fkremotedestination = :fkremotedestination',
+                              fkremotedestination=utils.uuid(fkremotedestination))
+
+    def get_single_number_reach_many(self, fkremotedestinations):
+        result = self.query_in('SELECT fkremotedestination, enablesinglenumberreach FROM remotedestinationdynamic '
+                               'WHERE fkremotedestination IN (:keys)', 'fkremotedestination',
+                               [utils.uuid(i) for i in fkremotedestinations])
+        return {key: rows[0] if rows else None for (key, rows) in result.items()}
 
-    def get_assigned_dn_list(self):
+    def get_assigned_dn_list(self, chunk_size=5000):
         sql = ("SELECT dnorpattern AS dn, MIN(r.name) AS name FROM numplan n, routepartition r "
                "WHERE r.pkid = n.fkroutepartition AND n.pkid IN (SELECT fknumplan FROM devicenumplanmap "
-               "WHERE fkdevice IN (SELECT pkid FROM device)) GROUP BY dn ORDER BY dn")
-        return self._gen_result_list(self._exec(sql))
+               "WHERE fkdevice IN (SELECT pkid FROM device)) GROUP BY dn")
+        return self.iter_query(sql, chunk_size, key='dn')
 
-    def get_inactive_dn_list(self):
+    def get_inactive_dn_list(self, chunk_size=5000):
         sql = ("SELECT n.pkid FROM numplan n LEFT OUTER JOIN devicenumplanmap m ON m.fkdevice = n.pkid "
                "WHERE m.fkdevice IS NULL AND n.tkpatternusage = '2' AND n.iscallable = 'f'")
-        return self._gen_result_list(self._exec(sql))
+        return self.iter_query(sql, chunk_size, key='pkid')
 
     def get_users_with_self_service_id(self, self_service_id):
-        sql = 'SELECT userid FROM enduser WHERE keypadenteredalternateidentifier LIKE "%(self_service_id)s"'
-        return self._gen_result_list(self._exec(sql % dict(self_service_id='%' + self_service_id + '%')))
+        return self.query('SELECT userid FROM enduser WHERE keypadenteredalternateidentifier LIKE :self_service_id',
+                          self_service_id='%' + self_service_id + '%')
 
-    def get_device_num_plan_map(self):
+    def get_device_num_plan_map(self, chunk_size=5000):
         sql = ("SELECT * FROM devicenumplanmap dnpm "
                "WHERE dnpm.fknumplan IN (SELECT n.pkid "
                "FROM numplan AS n INNER JOIN routepartition AS rp ON n.fkroutepartition=rp.pkid "
                "WHERE rp.name IN "
                "('SG-AA-Internal', 'SG-DA-Internal', 'SG-DT-Internal', 'SG-PH-Internal', 'SG-SH-Internal'))")
-        return self._gen_result_list(self._exec(sql))
\ No newline at end of file
+        return self.iter_query(sql, chunk_size, key='pkid')
\ No newline at end of file
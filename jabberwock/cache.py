@@ -0,0 +1,181 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryBackend(object):
+    """ In-memory LRU store with a time to live for every entry.
+
+    :param maxsize: Maximum number of entries, the least recently used entries are evicted first.
+    :param ttl: Time to live of an entry in seconds, None to keep entries until they are evicted.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class SqliteBackend(object):
+    """ LRU store with a time to live in a sqlite file, which can be shared by several processes.
+
+    :param path: Path of the sqlite file.
+    :param maxsize: Maximum number of entries, the least recently used entries are evicted first.
+    :param ttl: Time to live of an entry in seconds, None to keep entries until they are evicted.
+    """
+
+    def __init__(self, path, maxsize=100000, ttl=3600):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.local = threading.local()
+        with self._connection() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS entries '
+                               '(key TEXT PRIMARY KEY, value BLOB, expires REAL, accessed REAL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+
+    def _connection(self):
+        """ return a connection of the current thread and process.
+        """
+        connection = getattr(self.local, 'connection', None)
+        if connection is None or self.local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30)
+            self.local.connection, self.local.pid = connection, os.getpid()
+        return connection
+
+    def get(self, key):
+        now = time.time()
+        with self._connection() as connection:
+            row = connection.execute('SELECT value, expires FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires = row
+            if expires is not None and expires < now:
+                connection.execute('DELETE FROM entries WHERE key = ?', (key,))
+                return None
+            connection.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+        return value
+
+    def set(self, key, value):
+        now = time.time()
+        expires = now + self.ttl if self.ttl is not None else None
+        with self._connection() as connection:
+            connection.execute('INSERT OR REPLACE INTO entries (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+                               (key, value, expires, now))
+            connection.execute('DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed DESC '
+                               'LIMIT -1 OFFSET ?)', (self.maxsize,))
+
+    def delete(self, key):
+        with self._connection() as connection:
+            connection.execute('DELETE FROM entries WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute('DELETE FROM entries')
+
+
+class ModelCache(object):
+    """ Read-through cache for the get operations of the CUCM models.
+
+        Objects are stored as serialized XML by configuration, type and uuid.
+        A lookup by other criteria (e.g. userid) is stored as alias of the
+        uuid. Every uuid keeps the list of its aliases, invalidating the uuid
+        removes them all, and an alias that is not in that list is not used.
+        So a renamed object is not found by its old name.
+
+    :param backend: Store of the entries, defaults to a MemoryBackend.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else MemoryBackend()
+
+    @staticmethod
+    def _uuid_key(config_name, name, uuid):
+        return '%s|%s|uuid=%s' % (config_name, name, uuid.strip('{}').lower())
+
+    @staticmethod
+    def _aliases_key(config_name, name, uuid):
+        return '%s|%s|aliases=%s' % (config_name, name, uuid.strip('{}').lower())
+
+    @staticmethod
+    def _criteria_key(config_name, name, criteria):
+        return '%s|%s|%s' % (config_name, name, '&'.join('%s=%s' % i for i in sorted(criteria.items())))
+
+    def get(self, config_name, name, criteria):
+        """ return the cached data of an object or None.
+        """
+        if 'uuid' in criteria:
+            uuid = criteria['uuid']
+        else:
+            key = self._criteria_key(config_name, name, criteria)
+            uuid = self.backend.get(key)
+            if uuid is None:
+                return None
+            if key not in self._aliases(config_name, name, uuid):
+                self.backend.delete(key)
+                return None
+        return self.backend.get(self._uuid_key(config_name, name, uuid))
+
+    def _aliases(self, config_name, name, uuid):
+        """ return the criteria keys that are aliases of a uuid.
+        """
+        value = self.backend.get(self._aliases_key(config_name, name, uuid))
+        if value is None:
+            return []
+        return json.loads(value)
+
+    def set(self, config_name, name, criteria, uuid, data):
+        """ store the data of an object fetched with the given criteria.
+        """
+        self.backend.set(self._uuid_key(config_name, name, uuid), data)
+        if 'uuid' not in criteria:
+            key = self._criteria_key(config_name, name, criteria)
+            aliases = self._aliases(config_name, name, uuid)
+            if key not in aliases:
+                aliases.append(key)
+                self.backend.set(self._aliases_key(config_name, name, uuid), json.dumps(aliases))
+            self.backend.set(key, uuid)
+
+    def invalidate(self, config_name, name, uuid):
+        """ remove an object and all its aliases from the cache.
+        """
+        if uuid:
+            for key in self._aliases(config_name, name, uuid):
+                self.backend.delete(key)
+            self.backend.delete(self._aliases_key(config_name, name, uuid))
+            self.backend.delete(self._uuid_key(config_name, name, uuid))
+
+    def clear(self):
+        self.backend.clear()
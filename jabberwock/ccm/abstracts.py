@@ -1,8 +1,15 @@
+import asyncio
 import logging
+import time
 from boltons.iterutils import remap
+from lxml import etree
+from zeep.exceptions import Fault
+from zeep.exceptions import LookupError as ZeepLookupError
 from zeep.xsd.valueobjects import CompoundValue
-from jabberwock.axlhandler import AXLClient
+from jabberwock.axlhandler import AXLClient, AsyncAXLClient
 from jabberwock import exceptions
+from jabberwock import parsing
+from jabberwock import utils
 
 
 PF_LIST = 'list'
@@ -16,6 +23,52 @@ XSD_NS = 'ns0'
 log = logging.getLogger('jabberwock')
 
 
+class ModelMetadata(object):
+    """
+    Tags of the AXL types of a logical CUCM object.
+
+    Only depends on the schema, so it is computed once per client and object type and shared by all instances.
+
+    Attributes:
+        get_criteria: Tags of the get request (e.g. uuid, userid).
+        xtype_tags: Tags of the X-type used to add objects.
+        list_tags: Tags the list operation can return.
+        update_tags: Tags of the update request.
+        object_tags: Tags of the object as returned by get or used to add it.
+        substitutions: Mapping of tags to the tags that rename them in the update request (e.g. userid: newUserid).
+    """
+
+    def __init__(self, client, name):
+        self.get_criteria = self._tags(client, '%s%sReq' % (PF_GET.capitalize(), name))
+        self.xtype_tags = self._tags(client, 'X%s' % name)
+        self.list_tags = self._tags(client, 'L%s' % name)
+        self.update_tags = self._tags(client, '%s%sReq' % (PF_UPDATE.capitalize(), name))
+        self.object_tags = self.xtype_tags | self._tags(client, 'R%s' % name)
+        self.substitutions = dict()
+        for key in self.update_tags:
+            if key.startswith('new'):
+                tag = key[3:4].lower() + key[4:]
+                if tag in self.object_tags:
+                    self.substitutions[tag] = key
+
+    @staticmethod
+    def _tags(client, type_name):
+        try:
+            return frozenset(dir(client.lookup_type(type_name)()))
+        except ZeepLookupError:
+            return frozenset()
+
+    @classmethod
+    def get(cls, client, name):
+        """
+        Return the metadata of an object type, computing it on first use.
+        """
+        metadata = client.metadata.get(name)
+        if metadata is None:
+            metadata = client.metadata.setdefault(name, cls(client, name))
+        return metadata
+
+
 class BaseCUCMModel(object):
     """
     Provide base functionality for all logical entities in Cisco Unified Communications Solutions (CUCM).
@@ -28,25 +81,45 @@ class BaseCUCMModel(object):
         __config__: Name of the configuration
         __client: Client object used to communicate with AXL API
         __attached__: Is this object associated with an AXL object?
-        __updateable__: List containing all changed attributes since last object load
+        __snapshot__: Values of the attributes as loaded from CUCM
+        __dirty__: Names of all attributes assigned since the object was loaded or updated
+        __metadata__: Tags of the AXL types of this object, shared by all objects of the same type
+        __prefetched__: Related objects by association name, resolved for many objects at once with prefetch
+        __pending__: Search criteria of a lazy object that is not loaded from CUCM yet
+        __projection__: Tags a partially loaded object was loaded with, the other tags are fetched on first access
+        __async__: Was this object created by the asynchronous API? Such objects never fetch tags implicitly while an
+            event loop runs, use ahydrate
     """
 
     __config_name__ = ''
     __config__ = None
     __client__ = None
     __attached__ = False
-    __update_request__ = None
-    __update_substitutions__ = None
-    uuid = None
+    __snapshot__ = None
+    __dirty__ = None
+    __metadata__ = None
+    __prefetched__ = None
+    __pending__ = None
+    __projection__ = None
+    __async__ = False
 
     def __init__(self, *args, **kwargs):
         """
         Create a new CUCM object.
+
+        The keyword argument returns (e.g. returns=['name', 'devicePoolName']) loads only the given tags, see _load.
         """
         config_name = kwargs.pop('config_name', 'default')
+        self._set_defaults(kwargs)
         self._configure(config_name=config_name)
         self._initialize(**kwargs)
 
+    @classmethod
+    def _set_defaults(cls, kwargs):
+        """
+        Add the default values of an object type to the keyword arguments of the constructor, new, lazy and aget.
+        """
+
     def __setattr__(self, name, value):
         """
         Set the value of an attribute.
@@ -55,21 +128,35 @@ class BaseCUCMModel(object):
         """
         builtin = name.startswith('__') and name.endswith('__')
         if not builtin:
+            self._resolve()
             if self.__attached__:
-                self.__setattr_update__(name, value)
+                self.__dirty__.add(name)
         super().__setattr__(name, value)
 
-    def __setattr_update__(self, name, value):
-        if name in self.__update_substitutions__.keys():
-            name = self.__update_substitutions__[name]
-        setattr(self.__update_request__, name, value)
+    def __getattr__(self, name):
+        """
+        Get a lazy object from CUCM on first access of an attribute that is not set yet.
+
+        A tag a partially loaded object was not loaded with is fetched with all other missing tags on first access.
+        The uuid of an object without one is None.
+        """
+        if not (name.startswith('__') and name.endswith('__')):
+            if self.__pending__ is not None:
+                self._resolve()
+                return getattr(self, name)
+            if self.__projection__ is not None and name in self.__metadata__.object_tags:
+                self._hydrate()
+                return getattr(self, name)
+            if name == 'uuid':
+                return None
+        raise AttributeError("'%s' object has no attribute '%s'" % (self.__class__.__name__, name))
 
     @classmethod
     def _axl_operation(cls, prefix, name, client):
         """
         Return an AXL operation.
         """
-        return getattr(client.axl, '%s%s' % (prefix, name,))
+        return client.get_operation('%s%s' % (prefix, name,))
 
     @classmethod
     def _prepare_result(cls, result, returns):
@@ -94,29 +181,272 @@ class BaseCUCMModel(object):
             will automatically load this object.
         """
         self._load(**kwargs)
-        self.__update_request__ = self._get_update_request()
-        self.__update_substitutions__ = self._get_update_substitutions(self.__update_request__)
+        self._prepare_update()
+
+    def _prepare_update(self):
+        """
+        Attach a loaded object if it has an uuid.
+        """
         if self.uuid:
             self.__attached__ = True
 
-    def _load(self, **kwargs):
+    @classmethod
+    async def aget(cls, config_name='default', **kwargs):
         """
-        Get the specified object from Call Manager and merge its attributes with this CUCM object.
+        Asynchronously get the specified object from CUCM.
+
+        Takes the same search criteria as the constructor, e.g. "await User.aget(userid='kwroble')".
         """
-        operation = self._axl_operation(PF_GET, self.__name__, self.__client__)
-        uuid = kwargs.pop('uuid', '')
-        request = getattr(self.__client__.factory, '%s%sReq' % (PF_GET.capitalize(), self.__name__))()
+        cls._set_defaults(kwargs)
+        obj = cls.__new__(cls)
+        obj._configure(config_name=config_name)
+        obj.__async__ = True
+        await obj._aload(**kwargs)
+        obj._prepare_update()
+        return obj
+
+    @classmethod
+    def new(cls, config_name='default', **kwargs):
+        """
+        Return a new detached object with the given values without calling CUCM.
+
+        e.g. "User.new(userid='tedison', lastName='Edison')". Add it to CUCM with create.
+        """
+        cls._set_defaults(kwargs)
+        obj = cls.__new__(cls)
+        obj._configure(config_name=config_name)
+        obj._loadattr(obj._get_xtype(**kwargs))
+        return obj
+
+    @classmethod
+    def lazy(cls, config_name='default', **kwargs):
+        """
+        Return an object that is only loaded from CUCM when one of its attributes is first used.
+
+        Takes the same search criteria as the constructor, e.g. "User.lazy(userid='kwroble')". A uuid given as
+        criteria is available without loading the object.
+        """
+        cls._set_defaults(kwargs)
+        obj = cls.__new__(cls)
+        obj._configure(config_name=config_name)
+        obj.__pending__ = dict(kwargs)
+        if kwargs.get('uuid'):
+            super(BaseCUCMModel, obj).__setattr__('uuid', kwargs['uuid'])
+        return obj
+
+    def _resolve(self):
+        """
+        Load a lazy object from CUCM if it is not loaded yet.
+        """
+        pending = self.__pending__
+        if pending is None:
+            return
+        self._check_blocking()
+        self._load(**pending)
+        self.__pending__ = None
+        self._prepare_update()
+
+    async def _aresolve(self):
+        pending = self.__pending__
+        if pending is None:
+            return
+        await self._aload(**pending)
+        self.__pending__ = None
+        self._prepare_update()
+
+    def _check_blocking(self):
+        """
+        Refuse a synchronous call to CUCM for an object of the asynchronous API inside a running event loop.
+        """
+        if not self.__async__:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        raise exceptions.BlockingCallException('%s is not loaded completely and a synchronous get would block the '
+                                               'event loop, use "await obj.ahydrate()" first' % self.__name__)
+
+    def _hydrate(self):
+        """
+        Get the tags a partially loaded object was not loaded with from CUCM.
+
+        Attributes that are already set, including changed ones, are kept. The object stays partial if the get
+        fails.
+        """
+        if self.__projection__ is None:
+            return
+        self._check_blocking()
+        uuid = self.__dict__.get('uuid')
         if uuid:
             criteria = {'uuid': uuid}
-        else:
-            criteria = {key: value for (key, value) in kwargs.items() if key in request.__dict__['__values__'].keys()}
+            result = self._cache_get(criteria)
+            if result is None:
+                result = self._get(criteria)
+            self._complete(result)
+        self.__projection__ = None
+
+    async def ahydrate(self):
+        """
+        Asynchronously load a lazy object and the tags a partially loaded object was not loaded with.
+
+        Objects of the asynchronous API (e.g. from aget with returns) must be completed this way before other tags
+        are accessed inside a coroutine.
+        """
+        await self._aresolve()
+        if self.__projection__ is None:
+            return
+        uuid = self.__dict__.get('uuid')
+        if uuid:
+            criteria = {'uuid': uuid}
+            result = self._cache_get(criteria)
+            if result is None:
+                result = await self._aget(criteria)
+            self._complete(result)
+        self.__projection__ = None
+
+    def _complete(self, result):
+        """
+        Set the attributes of a partially loaded object that are missing from a complete result.
+        """
+        for k, v in result.__dict__['__values__'].items():
+            if k not in self.__dict__:
+                super().__setattr__(k, v)
+                self.__snapshot__[k] = v
+        log.debug('%s was completed, uuid=%s' % (self.__name__, self.uuid,))
+
+    @classmethod
+    def _from_result(cls, values, config_name='default', returns=None):
+        """
+        Build an object from already fetched values (e.g. a list result) without calling CUCM.
+
+        With returns, the values only hold these tags and the others are fetched on first access.
+        """
+        obj = cls.__new__(cls)
+        obj._configure(config_name=config_name)
+        obj._loadattr(values, returns)
+        obj._prepare_update()
+        return obj
+
+    @classmethod
+    def _detached(cls, values, config_name='default'):
+        """
+        Build a detached object from the given values without calling CUCM.
+        """
+        obj = cls.__new__(cls)
+        obj._configure(config_name=config_name)
+        obj._loadattr(values)
+        return obj
+
+    def _load(self, returns=None, **kwargs):
+        """
+        Get the specified object from Call Manager and merge its attributes with this CUCM object.
+
+        Without search criteria, or if the object does not exist, a new detached object is built from the X-type.
+        With returns, get only returns these tags (returnedTags). The other tags are fetched in a second call when
+        one of them is first accessed. A cached object is always loaded completely.
+        """
+        criteria = self._get_criteria(kwargs)
+        kwargs.pop('uuid', None)
+        if not criteria:
+            self._loadattr(self._get_xtype(**kwargs))
+            return
         try:
+            self._load_existing(criteria, returns)
+        except Fault as fault:
+            log.info('%s not found, building a new object: %s' % (self.__name__, fault))
+            self._loadattr(self._get_xtype(**kwargs))
+
+    def _load_existing(self, criteria, returns=None):
+        """
+        Load the object with the given get criteria from the cache or CUCM. An object that can't be found raises the
+        AXL fault.
+        """
+        result = self._cache_get(criteria)
+        if result is not None:
+            returns = None
+        else:
+            result = self._get(criteria, returns)
+        self._loadattr(result, returns)
+
+    def _get(self, criteria, returns=None):
+        """
+        Call get with the given criteria and return the unwrapped object. Complete objects are cached.
+        """
+        operation = self._axl_operation(PF_GET, self.__name__, self.__client__)
+        if returns is None:
             result = operation(**criteria)
-            result = getattr(getattr(result, 'return'), self._first_lower(self.__name__))
-        except:
-            print('Unable to get object. Creating xtype...')
-            result = self._get_xtype(**kwargs)
-        self._loadattr(result)
+        else:
+            result = operation(returnedTags=self._get_returned_tags(returns), **criteria)
+        result = getattr(getattr(result, 'return'), self._first_lower(self.__name__))
+        if returns is None:
+            self._cache_set(criteria, result)
+        return result
+
+    async def _aload(self, returns=None, **kwargs):
+        """
+        Asynchronous variant of _load. An object that can't be found raises the AXL fault.
+        """
+        criteria = self._get_criteria(kwargs)
+        result = self._cache_get(criteria)
+        if result is not None:
+            returns = None
+        else:
+            result = await self._aget(criteria, returns)
+        self._loadattr(result, returns)
+
+    async def _aget(self, criteria, returns=None):
+        """
+        Asynchronous variant of _get.
+        """
+        operation = self._axl_operation(PF_GET, self.__name__, self._async_client())
+        if returns is None:
+            result = await operation(**criteria)
+        else:
+            result = await operation(returnedTags=self._get_returned_tags(returns), **criteria)
+        result = getattr(getattr(result, 'return'), self._first_lower(self.__name__))
+        if returns is None:
+            self._cache_set(criteria, result)
+        return result
+
+    @staticmethod
+    def _get_returned_tags(returns):
+        return dict([(i, '') for i in returns if i != 'uuid'])
+
+    def _get_criteria(self, kwargs):
+        """
+        Return the arguments of the get operation from the given keyword arguments.
+        """
+        uuid = kwargs.get('uuid')
+        if uuid:
+            return {'uuid': uuid}
+        return {key: value for (key, value) in kwargs.items() if key in self.__metadata__.get_criteria}
+
+    def _cache_get(self, criteria):
+        """
+        Return the object cached for the given criteria or None.
+        """
+        cache = self.__client__.config.cache
+        if cache is None or not criteria:
+            return None
+        data = cache.get(self.__config_name__, self.__name__, criteria)
+        if data is None:
+            return None
+        xsd_type = self.__client__.lookup_type('R%s' % self.__name__)
+        return xsd_type.parse_xmlelement(etree.fromstring(data), self.__client__.wsdl.types)
+
+    def _cache_set(self, criteria, result):
+        cache = self.__client__.config.cache
+        if cache is None or not criteria or not getattr(result, 'uuid', None):
+            return
+        element = etree.Element(self._first_lower(self.__name__))
+        result._xsd_type.render(element, result)
+        cache.set(self.__config_name__, self.__name__, criteria, result.uuid, etree.tostring(element))
+
+    def _cache_invalidate(self, uuid):
+        cache = self.__client__.config.cache
+        if cache is not None:
+            cache.invalidate(self.__config_name__, self.__name__, uuid)
 
     @classmethod
     def _first_lower(cls, name):
@@ -151,52 +481,82 @@ class BaseCUCMModel(object):
         """
         self.__client__ = AXLClient.get_client(config_name=config_name)
         self.__config_name__ = config_name
+        self.__metadata__ = ModelMetadata.get(self.__client__, self.__name__)
+
+    def _async_client(self):
+        return AsyncAXLClient.get_client(config_name=self.__config_name__)
+
+    def _loadattr(self, obj, returns=None):
+        """
+        Copy all attributes from an AXL object (or a dictionary) to this CUCM object.
 
-    def _loadattr(self, obj):
+        The loaded values are kept as snapshot to find the changed attributes on update. With returns, only these
+        tags and the uuid are copied and the object is partially loaded.
         """
-        Copy all attributes from an AXL object to this CUCM object.
+        values = obj if isinstance(obj, dict) else obj.__dict__['__values__']
+        if returns is not None:
+            returns = list(returns)
+            values = {k: v for (k, v) in values.items() if k == 'uuid' or k in returns}
+        for k, v in values.items():
+            super().__setattr__(k, v)
+        self.__snapshot__ = dict(values)
+        self.__dirty__ = set()
+        self.__prefetched__ = None
+        self.__projection__ = returns
+
+    def _take_snapshot(self):
+        """
+        Use the current attributes as snapshot, e.g. after they were sent to CUCM.
         """
-        for k, v in obj.__dict__['__values__'].items():
-            self.__setattr__(k, v)
+        self.__snapshot__ = {k: v for (k, v) in self.__dict__.items() if not (k.startswith('__') and k.endswith('__'))}
+        self.__dirty__ = set()
+
+    def _get_prefetched(self, relation):
+        """
+        Return the objects prefetched for an association, or None if the association was not prefetched.
+        """
+        if self.__prefetched__ is None:
+            return None
+        return self.__prefetched__.get(relation)
 
     def _get_xtype(self, **kwargs):
         """
         Return an XType AXL object.
         """
-        x_type = getattr(self.__client__.factory, 'X%s' % self.__name__)()
-        tags = dir(x_type)
+        tags = self.__metadata__.xtype_tags
         kwargs = {key: value for (key, value) in kwargs.items() if key in tags}
         kwargs = self._strip_empty_tags(kwargs)
-        x_type = getattr(self.__client__.factory, 'X%s' % self.__name__)(**kwargs)
-        return x_type
-
-    def _get_update_request(self, **kwargs):
-        return getattr(self.__client__.factory, '%s%sReq' % (PF_UPDATE.capitalize(), self.__name__))(**kwargs)
-
-    def _get_update_substitutions(self, update_request):
-        subs = {}
-        for key in dir(update_request):
-            if key.startswith('new'):
-                tag = self._first_lower(key[3:])
-                if tag in dir(self):
-                    subs[tag] = key
-        return subs
+        return self.__client__.lookup_type('X%s' % self.__name__)(**kwargs)
 
     def create(self):
         """
         Add this object to CUCM.
         """
+        operation = self._axl_operation(PF_ADD, self.__name__, self.__client__)
+        result = operation(self._get_create_request())
+        return self._created(result)
+
+    async def acreate(self):
+        """
+        Asynchronous variant of create.
+        """
+        operation = self._axl_operation(PF_ADD, self.__name__, self._async_client())
+        result = await operation(self._get_create_request())
+        return self._created(result)
+
+    def _get_create_request(self):
+        self._resolve()
         if self.__attached__:
             raise exceptions.CreationException('this object is already attached')
-        operation = self._axl_operation(PF_ADD, self.__name__, self.__client__)
-        x_type = getattr(self.__client__.factory, 'X%s' % self.__name__)()
-        tags = dir(x_type)
+        tags = self.__metadata__.xtype_tags
         unwrapped = {key: value for (key, value) in self.__dict__.items() if key in tags}
-        x_type = self._get_xtype(**unwrapped)
-        result = operation(x_type)
+        return self._get_xtype(**unwrapped)
+
+    def _created(self, result):
         self.uuid = result['return']
+        self._cache_invalidate(self.uuid)
         self.__attached__ = True
-        self.__update_request__ = self._get_update_request(uuid=self.uuid)
+        self._take_snapshot()
         log.info('new %s was created, uuid=%s' % (self.__name__, self.uuid,))
         return self.uuid
 
@@ -204,42 +564,140 @@ class BaseCUCMModel(object):
         """
         Update the CUCM object with all changes made to this object.
         """
+        values = self._get_update_values()
+        if values is None:
+            log.debug('%s has no changes, uuid=%s' % (self.__name__, self.uuid,))
+            return
+        operation = self._axl_operation(PF_UPDATE, self.__name__, self.__client__)
+        operation(**values)
+        self._updated()
+
+    async def aupdate(self):
+        """
+        Asynchronous variant of update.
+        """
+        await self._aresolve()
+        values = self._get_update_values()
+        if values is None:
+            log.debug('%s has no changes, uuid=%s' % (self.__name__, self.uuid,))
+            return
+        operation = self._axl_operation(PF_UPDATE, self.__name__, self._async_client())
+        await operation(**values)
+        self._updated()
+
+    def _get_update_values(self):
+        """
+        Return the arguments of the update operation with all changed attributes, or None if nothing changed.
+        """
+        self._resolve()
         if not self.__attached__:
             raise exceptions.UpdateException('you must create an object with "create" before update')
-        self.__update_request__.uuid = self.uuid
-        operation = self._axl_operation(PF_UPDATE, self.__name__, self.__client__)
-        operation(**self.__update_request__.__dict__['__values__'])
-        self.__update_request__ = self._get_update_request(uuid=self.uuid)
+        changes = self._get_changes()
+        if not changes:
+            return None
+        changes['uuid'] = self.uuid
+        return changes
+
+    def _get_changes(self):
+        """
+        Return all attributes whose value differs from the snapshot, renamed to their update tags.
+
+        Attributes the update request has no tag for (e.g. read-only tags or helper attributes) are skipped.
+        """
+        changes = dict()
+        update_tags = self.__metadata__.update_tags
+        substitutions = self.__metadata__.substitutions
+        for name in self.__dirty__:
+            if name == 'uuid' or name not in self.__dict__:
+                continue
+            tag = substitutions.get(name, name)
+            if tag not in update_tags:
+                log.debug('%s has no update tag for %s, skipped' % (self.__name__, name,))
+                continue
+            value = self.__dict__[name]
+            if name in self.__snapshot__ and not self._is_changed(self.__snapshot__[name], value):
+                continue
+            changes[tag] = value
+        return changes
+
+    @staticmethod
+    def _is_changed(old, new):
+        """
+        Compare a value to its snapshot. A mutable value assigned again may have been changed in place.
+        """
+        if new is old:
+            return not isinstance(new, (str, int, float, bool, type(None)))
+        return new != old
+
+    def _updated(self):
+        self._cache_invalidate(self.uuid)
+        for name in self.__dirty__:
+            if name in self.__dict__:
+                self.__snapshot__[name] = self.__dict__[name]
+        self.__dirty__ = set()
         log.info('%s was updated, uuid=%s' % (self.__name__, self.uuid,))
 
     def remove(self):
         """
         Delete this object from CUCM.
         """
+        self._check_removable()
+        operation = self._axl_operation(PF_REMOVE, self.__name__, self.__client__)
+        operation(uuid=self.uuid)
+        self._removed()
+
+    async def aremove(self):
+        """
+        Asynchronous variant of remove.
+        """
+        await self._aresolve()
+        self._check_removable()
+        operation = self._axl_operation(PF_REMOVE, self.__name__, self._async_client())
+        await operation(uuid=self.uuid)
+        self._removed()
+
+    def _check_removable(self):
+        self._resolve()
         if not self.__attached__:
             msg = 'This object is not attached and can not removed from CUCM'
             raise exceptions.RemoveException(msg)
-        operation = self._axl_operation(PF_REMOVE, self.__name__, self.__client__)
-        operation(uuid=self.uuid)
+
+    def _removed(self):
+        uuid = self.uuid
+        self._cache_invalidate(uuid)
         self.uuid = None
         self.__attached__ = False
-        self.__update_request__ = self._get_update_request()
-        log.info('%s was removed, uuid=%s' % (self.__name__, self.uuid,))
+        self.__dirty__ = set()
+        log.info('%s was removed, uuid=%s' % (self.__name__, uuid,))
 
     def reload(self):
         """
-        Reload this object from CUCM.
+        Reload this object from CUCM. A partially loaded object is reloaded completely.
+        """
+        self._check_reloadable()
+        self._cache_invalidate(self.uuid)
+        self._load(uuid=self.uuid)
+
+    async def areload(self):
         """
+        Asynchronous variant of reload.
+        """
+        await self._aresolve()
+        self._check_reloadable()
+        self._cache_invalidate(self.uuid)
+        await self._aload(uuid=self.uuid)
+
+    def _check_reloadable(self):
+        self._resolve()
         if not self.__attached__:
             msg = 'This object is not attached and can not be reloaded from CUCM'
             raise exceptions.ReloadException(msg)
-        self._load(uuid=self.uuid)
-        self.__update_request__ = self._get_update_request(uuid=self.uuid)
 
     def reset(self):
         """
         Reset this object.
         """
+        self._resolve()
         if not self.__attached__:
             msg = 'This object is not attached and can not be reset.'
             raise exceptions.ResetException(msg)
@@ -256,15 +714,20 @@ class BaseCUCMModel(object):
         After cloning, the new object will be detached.
         This means the cloned object can be directly added to CUCM with the create function.
         """
-        obj = self.__class__()
+        self._resolve()
+        self._hydrate()
+        obj = self.__class__.__new__(self.__class__)
         obj.__dict__.update(self.__dict__)
         obj.uuid = None
         obj.__attached__ = False
+        obj.__snapshot__ = dict()
+        obj.__dirty__ = set()
+        obj.__prefetched__ = None
         log.debug('%s was cloned' % self.__name__)
         return obj
 
     @classmethod
-    def list(cls, criteria, returns, skip=None, first=None, configname='default'):
+    def list(cls, criteria, returns, skip=None, first=None, configname='default', form=None):
         """
 
         :param criteria: Dictionary of search criteria.
@@ -272,10 +735,46 @@ class BaseCUCMModel(object):
         :param skip: The number of results to skip, starting at the first.
         :param first: The maximum number of results to return, starting at the first.
         :param configname: Name of the configuration. Default value is 'default'
+        :param form: None to return a dict of zeep values per result. 'tuple' to return a list of named tuples or
+            'columns' to return a dict with a list of values per tag. Both lean forms parse the response directly
+            into the returned tags (as text) without building zeep objects.
         :yeild: Returns the matching search results.
         """
         client = AXLClient.get_client(configname)
         operation = cls._axl_operation(PF_LIST, cls.__name__, client)
+        args = cls._get_list_args(criteria, returns, skip, first)
+        if form is not None:
+            return cls._list_rows(client, operation, args, list(returns), form)
+        return cls._prepare_result(operation(*args), returns)
+
+    @classmethod
+    def _list_rows(cls, client, operation, args, returns, form):
+        """
+        Call the list operation and parse the raw response into lean rows, see list.
+        """
+        if form not in parsing.FORMS:
+            raise ValueError('unknown form %r, use one of %s' % (form, ', '.join(parsing.FORMS)))
+
+        def process(response):
+            parsing.raise_for_fault(client, operation.name, response)
+            return parsing.parse_rows(response.content, cls.__name__, cls._first_lower(cls.__name__), returns, form,
+                                      client.config.parse_processes)
+
+        return operation.raw(process)(*args)
+
+    @classmethod
+    async def alist(cls, criteria, returns, skip=None, first=None, configname='default'):
+        """
+        Asynchronous variant of list, use it with "async for".
+        """
+        client = AsyncAXLClient.get_client(configname)
+        operation = cls._axl_operation(PF_LIST, cls.__name__, client)
+        result = await operation(*cls._get_list_args(criteria, returns, skip, first))
+        for row in cls._prepare_result(result, returns):
+            yield row
+
+    @classmethod
+    def _get_list_args(cls, criteria, returns, skip, first):
         tags = dict([(i, '') for i in returns])
         log.debug('fetch list of %ss, search criteria=%s' % (cls.__name__, str(criteria)))
         args = criteria, tags
@@ -286,24 +785,160 @@ class BaseCUCMModel(object):
                 args = criteria, tags, skip
             else:
                 args = criteria, tags, skip, first
-        return cls._prepare_result(operation(*args), returns)
+        return args
+
+    @classmethod
+    def bulk_create(cls, objs, concurrency=4):
+        """
+        Add all objects to CUCM, see create.
+
+        :param objs: Iterable of detached objects.
+        :param concurrency: Number of calls running at the same time.
+        :return: List of BulkResult in the order of objs.
+        """
+        return cls._bulk('create', objs, concurrency)
+
+    @classmethod
+    def bulk_update(cls, objs, concurrency=4):
+        """
+        Update all objects in CUCM, see update.
+
+        :param objs: Iterable of attached objects.
+        :param concurrency: Number of calls running at the same time.
+        :return: List of BulkResult in the order of objs.
+        """
+        return cls._bulk('update', objs, concurrency)
+
+    @classmethod
+    def bulk_remove(cls, objs, concurrency=4):
+        """
+        Delete all objects from CUCM, see remove.
+
+        :param objs: Iterable of attached objects.
+        :param concurrency: Number of calls running at the same time.
+        :return: List of BulkResult in the order of objs.
+        """
+        return cls._bulk('remove', objs, concurrency)
+
+    @classmethod
+    def _bulk(cls, method, objs, concurrency):
+        """
+        Call the given method on all objects. A failing object does not abort the others.
+        """
+        def run(obj):
+            uuid = obj.uuid
+            start = time.perf_counter()
+            try:
+                getattr(obj, method)()
+            except Exception as e:
+                log.info('bulk %s of %s failed: %s' % (method, obj.__name__, e))
+                return BulkResult(obj, exception=e, elapsed=time.perf_counter() - start)
+            return BulkResult(obj, uuid=obj.uuid or uuid, elapsed=time.perf_counter() - start)
+
+        return list(utils.imap_bounded(run, objs, concurrency))
+
+    @classmethod
+    def iter(cls, criteria, returns, page_size=1000, skip=0, configname='default', form=None):
+        """
+        Return all search results page by page.
+
+        Only one page is kept in memory. If CUCM rejects a page because the response is too large, the page size is
+        reduced and the page is fetched again.
+
+        :param criteria: Dictionary of search criteria.
+        :param returns: List of the desired returned tags.
+        :param page_size: The number of results fetched with one list call.
+        :param skip: The number of results to skip, starting at the first.
+        :param configname: Name of the configuration. Default value is 'default'
+        :param form: None for dicts of zeep values or 'tuple' for named tuples, see list.
+        :yield: Returns the matching search results.
+        """
+        if form not in (None, 'tuple'):
+            raise ValueError('iter returns rows, form must be None or \'tuple\'')
+        while True:
+            try:
+                rows = list(cls.list(criteria, returns, skip, page_size, configname, form))
+            except Fault as fault:
+                smaller = utils.reduced_page_size(fault, page_size)
+                if smaller is None:
+                    raise
+                log.debug('list of %ss too large, reduce page size from %s to %s' % (cls.__name__, page_size, smaller))
+                page_size = smaller
+                continue
+            count = len(rows)
+            yield from rows
+            rows = None
+            if count < page_size:
+                return
+            skip += count
 
     @classmethod
-    def list_obj(cls, criteria, skip=None, first=None, configname='default'):
+    def list_obj(cls, criteria, skip=None, first=None, configname='default', returns=None, concurrency=1):
         """
         Return all objects that match the given search criteria.
 
         The return value is generator. Each next() call will fetch a new instance and return it as an object.
+
+        :param criteria: Dictionary of search criteria.
+        :param skip: The number of results to skip, starting at the first.
+        :param first: The maximum number of results to return, starting at the first.
+        :param configname: Name of the configuration. Default value is 'default'
+        :param returns: List of the tags the objects need. If list can return all of them, the objects are built
+            from a single list call. Otherwise every object is fetched with get, returning only these tags. Other
+            tags are fetched when they are first accessed.
+        :param concurrency: Number of get calls running at the same time.
+        :yield: Returns the matching objects.
+        """
+        client = AXLClient.get_client(configname)
+        if returns is not None and cls._listable(client, returns):
+            returns = list(returns) if 'uuid' in returns else list(returns) + ['uuid']
+            for values in cls.list(criteria, returns, skip, first, configname):
+                yield cls._from_result(values, configname, returns)
+            return
+        uuids = (obj['uuid'] for obj in cls.list(criteria, ['uuid'], skip, first, configname))
+        yield from utils.imap_bounded(lambda uuid: cls(uuid=uuid, config_name=configname, returns=returns), uuids,
+                                      concurrency)
+
+    @classmethod
+    def _listable(cls, client, returns):
+        """
+        Return True if the list operation can return all of the given tags.
         """
-        for obj in cls.list(criteria, 'uuid', skip, first, configname):
-            yield cls(uuid=obj['uuid'])
+        tags = ModelMetadata.get(client, cls.__name__).list_tags
+        return all(tag == 'uuid' or tag in tags for tag in returns)
+
+
+class BulkResult(object):
+    """
+    Result of a bulk operation for a single object.
+
+    Attributes:
+        obj: The CUCM object.
+        uuid: uuid of the object if the operation succeeded.
+        exception: Exception raised by the operation if it failed.
+        elapsed: Duration of the operation in seconds.
+    """
+
+    def __init__(self, obj, uuid=None, exception=None, elapsed=0.0):
+        self.obj = obj
+        self.uuid = uuid
+        self.exception = exception
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.exception is None
+
+    def __repr__(self):
+        outcome = self.uuid if self.ok else repr(self.exception)
+        return '<%s %s %s (%.3fs)>' % (self.__class__.__name__, self.obj.__name__, outcome, self.elapsed)
 
 
 class BaseXType(object):
 
     def __new__(cls, *args, **kwargs):
         client = AXLClient.get_client()
-        return getattr(client.factory, cls.__name__)(*args, **kwargs)
+        return client.lookup_type(cls.__name__)(*args, **kwargs)
 
 
 class BaseXTypeListItem(dict):
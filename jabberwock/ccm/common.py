@@ -47,18 +47,22 @@ class User(BaseCUCMModel, MixingAbstractTemplate):
         """
         Return phones that are associated with this user.
         """
-        sql_utils = AXLSQLUtils(self.__config_name__)
         if not self.__attached__:
             raise exceptions.NotAttachedException('User is not attached')
+        prefetched = self._get_prefetched('devices')
+        if prefetched is not None:
+            yield from prefetched
+            return
+        sql_utils = AXLSQLUtils.get_instance(self.__config_name__)
         for i in sql_utils.user_phone_association(self.uuid):
-            yield Phone(uuid=i['fkdevice'])
+            yield Phone(uuid=i['fkdevice'], config_name=self.__config_name__)
 
     def get_cups_cupc(self):
         cups, cupc, pkid = self._get_cups_cupc()
         return cups, cupc
 
     def set_cups_cupc(self, cups, cupc):
-        sqlutils = AXLSQLUtils(self.__config_name__)
+        sqlutils = AXLSQLUtils.get_instance(self.__config_name__)
         if cupc and not cups:
             raise exceptions.PyAXLException('If cupc is true, cups must also be true')
         rcups, rcupc, pkid = self._get_cups_cupc()
@@ -70,7 +74,7 @@ class User(BaseCUCMModel, MixingAbstractTemplate):
             sqlutils.update_cups(self._uuid, cupc)
 
     def _get_cups_cupc(self):
-        sql_utils = AXLSQLUtils(self.__config_name__)
+        sql_utils = AXLSQLUtils.get_instance(self.__config_name__)
         if not self.__attached__:
             raise exceptions.NotAttachedException('User is not attached')
         re = sql_utils.has_cups_cupc(self.uuid)
@@ -84,25 +88,34 @@ class UserGroup(BaseCUCMModel):
 
 
 class Line(BaseCUCMModel):
-    def __init__(self, **kwargs):
+
+    @classmethod
+    def _set_defaults(cls, kwargs):
         kwargs.setdefault('usage', 'Device')
-        super().__init__(**kwargs)
 
     def get_primary_users(self):
         """ Return users that have this line set as a primary extension."""
-        sql_utils = AXLSQLUtils(self.__config_name__)
         if not self.__attached__:
             raise exceptions.NotAttachedException('Line is not attached')
+        prefetched = self._get_prefetched('primary_users')
+        if prefetched is not None:
+            yield from prefetched
+            return
+        sql_utils = AXLSQLUtils.get_instance(self.__config_name__)
         for i in sql_utils.number_user_association(self.uuid):
-            yield User(uuid=i['fkenduser'])
+            yield User(uuid=i['fkenduser'], config_name=self.__config_name__)
 
     def get_associated_devices(self):
         """ Return devices that are associated to this directory number."""
-        sql_utils = AXLSQLUtils(self.__config_name__)
         if not self.__attached__:
             raise exceptions.NotAttachedException('Line is not attached')
-        for i in sql_utils.number_user_association(self.uuid):
-            yield User(uuid=i['fkenduser'])
+        prefetched = self._get_prefetched('devices')
+        if prefetched is not None:
+            yield from prefetched
+            return
+        sql_utils = AXLSQLUtils.get_instance(self.__config_name__)
+        for i in sql_utils.number_device_association(self.uuid):
+            yield Phone(uuid=i['pkid'], config_name=self.__config_name__)
 
 
 class TransPattern(BaseCUCMModel):
@@ -122,15 +135,15 @@ class Phone(BaseCUCMModel,
     def logout(self):
         if not self.__attached__:
             raise exceptions.LogoutException('Phone is not attached')
-        self.__client__.service.doDeviceLogout(dict(_uuid=self._uuid))
+        self.__client__.get_operation('doDeviceLogout')(dict(_uuid=self._uuid))
 
     def login(self, user, deviceProfile, duration=1):
         if not self.__attached__:
             raise exceptions.LogoutException('Phone is not attached')
-        self.__client__.service.doDeviceLogin(dict(_uuid=self._uuid),
-                                              duration,
-                                              dict(_uuid=deviceProfile._uuid),
-                                              user.userid)
+        self.__client__.get_operation('doDeviceLogin')(dict(_uuid=self._uuid),
+                                                      duration,
+                                                      dict(_uuid=deviceProfile._uuid),
+                                                      user.userid)
 
             
 class AppUser(BaseCUCMModel):
@@ -202,13 +215,13 @@ class RemoteDestination(BaseCUCMModel):
         """
         if not self.__attached__:
             raise exceptions.NotAttachedException('User is not attached')
-        sqlutils = AXLSQLUtils(self.__config_name__)
+        sqlutils = AXLSQLUtils.get_instance(self.__config_name__)
         sqlutils.set_single_number_reach(self._uuid, value)
 
     def get_single_number_reach(self):
         if not self.__attached__:
             raise exceptions.NotAttachedException('User is not attached')
-        sqlutils = AXLSQLUtils(self.__config_name__)
+        sqlutils = AXLSQLUtils.get_instance(self.__config_name__)
         value = sqlutils.get_single_number_reach(self._uuid)
         return value['enablesinglenumberreach'] == 't'
 
@@ -220,6 +233,10 @@ class RemoteDestinationProfile(BaseCUCMModel,
     def template(cls, *args, **kwargs):
         return super().template(*args, typeclass='Remote Destination Profile', **kwargs)
 
+    @classmethod
+    def expand(cls, items, *args, **kwargs):
+        return super().expand(items, *args, typeclass='Remote Destination Profile', **kwargs)
+
 
 class TodAccess(BaseCUCMModel):
     pass
@@ -231,19 +248,65 @@ class TimeSchedule(BaseCUCMModel):
         if not isinstance(members, list):
             members = [members]
         removeMembers = [dict(member=dict(timePeriodName=dict(_uuid=uuid))) for uuid in members]
-        self.__client__.service.updateTimeSchedule(removeMembers=removeMembers, uuid=self._uuid)
+        self.__client__.get_operation('updateTimeSchedule')(removeMembers=removeMembers, uuid=self._uuid)
 
     def addMembers(self, members):
         if not isinstance(members, list):
             members = [members]
         addMembers = [dict(member=dict(timePeriodName=dict(_uuid=uuid))) for uuid in members]
-        self.__client__.service.updateTimeSchedule(addMembers=addMembers, uuid=self._uuid)
+        self.__client__.get_operation('updateTimeSchedule')(addMembers=addMembers, uuid=self._uuid)
 
 
 class TimePeriod(BaseCUCMModel):
     pass
 
 
+# (object type, association): (AXLSQLUtils query, related column, related object type)
+RELATIONS = {
+    ('User', 'devices'): ('user_phone_association_many', 'fkdevice', Phone),
+    ('Line', 'primary_users'): ('number_user_association_many', 'fkenduser', User),
+    ('Line', 'devices'): ('number_device_association_many', 'pkid', Phone),
+}
+
+
+def prefetch(objs, relation, concurrency=4):
+    """ resolve an association for many objects at once, e.g. prefetch(users, 'devices').
+
+        The association is resolved with one SQL query per AXLSQLUtils.IN_BATCH_SIZE
+        objects and every related object is loaded only once, even if it is
+        shared by several objects. Afterwards the association helpers
+        (User.get_mobility_association, Line.get_primary_users,
+        Line.get_associated_devices) return the prefetched objects without
+        further calls until the object is reloaded.
+
+    :param objs: Attached objects of the same type and configuration.
+    :param relation: Name of the association, see RELATIONS.
+    :param concurrency: Number of get calls running at the same time to load the related objects.
+    :return: List of the objects.
+    """
+    objs = list(objs)
+    if not objs:
+        return objs
+    name, config_name = objs[0].__name__, objs[0].__config_name__
+    try:
+        query, related_key, related_cls = RELATIONS[(name, relation)]
+    except KeyError:
+        raise ValueError('%s has no association %r' % (name, relation))
+    for obj in objs:
+        if not obj.__attached__:
+            raise exceptions.NotAttachedException('%s is not attached' % name)
+    rows = getattr(AXLSQLUtils.get_instance(config_name), query)([obj.uuid for obj in objs])
+    related = {key: [row[related_key] for row in values] for (key, values) in rows.items()}
+    uuids = list(dict.fromkeys(uuid for values in related.values() for uuid in values))
+    loaded = dict(zip(uuids, utils.imap_bounded(lambda uuid: related_cls(uuid=uuid, config_name=config_name),
+                                                uuids, concurrency)))
+    for obj in objs:
+        if obj.__prefetched__ is None:
+            obj.__prefetched__ = dict()
+        obj.__prefetched__[relation] = [loaded[uuid] for uuid in related.get(utils.uuid(obj.uuid), ())]
+    return objs
+
+
 def main():
     return
 
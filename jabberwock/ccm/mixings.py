@@ -1,5 +1,10 @@
+import copy
+import json
 import logging
+import threading
 import types
+from collections import OrderedDict
+from jabberwock import exceptions
 from jabberwock.ccm.xtypes import XPhoneLine, XEnduserMember
 
 log = logging.getLogger('pyaxl')
@@ -9,6 +14,10 @@ class MixingAbstractTemplate(object):
     """ Mixing class for all Types with template support.
     """
 
+    SKELETONS_SIZE = 128
+    __skeletons__ = OrderedDict()
+    __skeletons_lock__ = threading.Lock()
+
     @classmethod
     def template(cls, *args, typeclass=None, **kwargs):
         """ return with the given search criteria an complete object.
@@ -19,9 +28,73 @@ class MixingAbstractTemplate(object):
         log.debug('%s created from template, criteria: %s, %s' % (cls.__name__, str(args), str(kwargs),))
         obj = template.clone()
         if typeclass is not None:
-            obj['class'] = typeclass
+            setattr(obj, 'class', typeclass)
         return obj
 
+    @classmethod
+    def expand(cls, items, *args, typeclass=None, refresh=False, **kwargs):
+        """ return detached objects built from a template, one for each
+            dictionary of values in items, e.g.
+            Phone.expand([dict(name='SEP001122334455'), ...], name='TPL_8845')
+
+            The template is fetched with the given search criteria only once,
+            its X-type values are cached per configuration and criteria
+            (refresh=True fetches it again). The cache keeps the SKELETONS_SIZE
+            most recently used templates, criteria that can't be serialized are
+            not cached. The objects are built locally, nothing is sent to CUCM
+            before they are created, see provision.
+        """
+        config_name = kwargs.get('config_name', 'default')
+        key = cls._skeleton_key(config_name, typeclass, args, kwargs)
+        skeleton = None if refresh or key is None else cls._cached_skeleton(key)
+        if skeleton is None:
+            template = cls(*args, **kwargs)
+            if not template.uuid:
+                raise exceptions.CreationException('template %s not found, criteria: %s, %s'
+                                                   % (cls.__name__, str(args), str(kwargs)))
+            tags = template.__metadata__.xtype_tags
+            skeleton = {k: v for (k, v) in template.__dict__.items() if k in tags and k != 'uuid'}
+            if typeclass is not None:
+                skeleton['class'] = typeclass
+            if key is not None:
+                cls._cache_skeleton(key, skeleton)
+                log.debug('%s template cached, criteria: %s, %s' % (cls.__name__, str(args), str(kwargs),))
+        return (cls._detached(dict(copy.deepcopy(skeleton), **item), config_name) for item in items)
+
+    @classmethod
+    def _skeleton_key(cls, config_name, typeclass, args, kwargs):
+        """ return the cache key of a template, or None if its criteria can't be serialized.
+        """
+        try:
+            return json.dumps([config_name, cls.__name__, typeclass, args, kwargs], sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def _cached_skeleton(cls, key):
+        with cls.__skeletons_lock__:
+            skeleton = cls.__skeletons__.get(key)
+            if skeleton is not None:
+                cls.__skeletons__.move_to_end(key)
+            return skeleton
+
+    @classmethod
+    def _cache_skeleton(cls, key, skeleton):
+        with cls.__skeletons_lock__:
+            cls.__skeletons__[key] = skeleton
+            cls.__skeletons__.move_to_end(key)
+            while len(cls.__skeletons__) > cls.SKELETONS_SIZE:
+                cls.__skeletons__.popitem(last=False)
+
+    @classmethod
+    def provision(cls, items, *args, concurrency=4, **kwargs):
+        """ create objects from a template, see expand. The objects are
+            built while the previous ones are created, concurrency create
+            calls run at the same time.
+            return a list of BulkResult in the order of items.
+        """
+        return cls.bulk_create(cls.expand(items, *args, **kwargs), concurrency)
+
 
 class MixingAbstractLines(object):
 
@@ -1,13 +1,18 @@
 from zeep.settings import Settings
+from jabberwock.throttle import Throttle
 
 
 class AXLClientSettings(object):
 
     def __init__(self, host, username, password, version,
                  schema_path=None, zeep_settings=None, proxy=None,
-                 transport_debugger=False):
+                 transport_debugger=False, schema_snapshot=None, throttle=None,
+                 cache=None, pool_size=10, pool_block=False, keep_alive=True,
+                 connect_timeout=10, read_timeout=60, metrics=None, port=8443, parse_processes=None):
         if proxy is None:
             proxy = dict()
+        if throttle is None:
+            throttle = Throttle()
         if zeep_settings is None:
             zeep_settings = {'strict': False, 'xml_huge_tree': True}
         self.host = host
@@ -18,6 +23,17 @@ class AXLClientSettings(object):
         self.proxy = proxy
         self.transport_debugger = transport_debugger
         self.version = version
+        self.schema_snapshot = schema_snapshot
+        self.throttle = throttle
+        self.cache = cache
+        self.pool_size = pool_size
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.metrics = metrics
+        self.port = port
+        self.parse_processes = parse_processes
 
 
 class ConfigurationRegistry(object):
@@ -30,5 +46,8 @@ class ConfigurationRegistry(object):
     def get(self, name='default'):
         return self.configurations[name]
 
+    def names(self):
+        return list(self.configurations)
+
 
 registry = ConfigurationRegistry()
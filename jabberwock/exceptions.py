@@ -32,3 +32,15 @@ class NotAttachedException(JabberwockException):
 
 class ProtocolException(JabberwockException):
     pass
+
+
+class ThrottledException(JabberwockException):
+    pass
+
+
+class ClusterTimeoutException(JabberwockException):
+    pass
+
+
+class BlockingCallException(JabberwockException):
+    pass
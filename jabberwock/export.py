@@ -0,0 +1,250 @@
+import bz2
+import csv
+import gzip
+import json
+import logging
+import lzma
+import os
+import queue
+import threading
+import time
+from jabberwock.axlsql import AXLSQL
+
+log = logging.getLogger('jabberwock')
+
+FORMATS = ('csv', 'jsonl', 'parquet')
+COMPRESSIONS = {'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+SUFFIXES = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+
+
+class ExportResult(object):
+    """
+    Result of an export.
+
+    Attributes:
+        path: Path of the written file.
+        format: Format of the file (csv, jsonl or parquet).
+        fields: Names of the columns.
+        rows: Number of written rows.
+        elapsed: Duration of the export in seconds.
+    """
+
+    def __init__(self, path, format):
+        self.path = path
+        self.format = format
+        self.fields = None
+        self.rows = 0
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        return '<ExportResult %s %s rows=%d %.1fs>' % (self.path, self.format, self.rows, self.elapsed)
+
+
+def _text(value):
+    """ return a value as text for CSV and Parquet, references and other nested values become JSON.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+class _TextWriter(object):
+
+    def __init__(self, path, fields, compression):
+        self.fields = fields
+        opener = COMPRESSIONS[compression] if compression else open
+        self.fp = opener(path, 'wt', encoding='utf-8', newline='')
+
+    def close(self):
+        self.fp.close()
+
+
+class CSVWriter(_TextWriter):
+    """ write rows as CSV with a header line.
+    """
+
+    def __init__(self, path, fields, compression=None):
+        super().__init__(path, fields, compression)
+        self.writer = csv.writer(self.fp)
+        self.writer.writerow(fields)
+
+    def write(self, rows):
+        self.writer.writerows([_text(value) for value in row] for row in rows)
+
+
+class JSONLWriter(_TextWriter):
+    """ write every row as a JSON object on its own line.
+    """
+
+    def write(self, rows):
+        fields = self.fields
+        self.fp.writelines(json.dumps(dict(zip(fields, row)), default=str) + '\n' for row in rows)
+
+
+class ParquetWriter(object):
+    """ write rows as Parquet file with a text column per field, requires pyarrow.
+    """
+
+    def __init__(self, path, fields, compression=None):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError('the parquet export requires pyarrow, install it with "pip install jabberwock[parquet]"')
+        self.pyarrow = pyarrow
+        self.fields = fields
+        self.schema = pyarrow.schema([(field, pyarrow.string()) for field in fields])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema, compression=compression or 'snappy')
+
+    def write(self, rows):
+        columns = [[_text(row[i]) for row in rows] for i in range(len(self.fields))]
+        self.writer.write_batch(self.pyarrow.record_batch(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {'csv': CSVWriter, 'jsonl': JSONLWriter, 'parquet': ParquetWriter}
+
+
+def _guess(path, format, compression):
+    """ return the format and compression of a path if they are not given, e.g. users.csv.gz is csv with gzip.
+    """
+    root, suffix = os.path.splitext(path)
+    if compression is None and format != 'parquet' and suffix in SUFFIXES:
+        compression = SUFFIXES[suffix]
+    if suffix in SUFFIXES:
+        suffix = os.path.splitext(root)[1]
+    if format is None:
+        format = suffix[1:].lower()
+    if format not in FORMATS:
+        raise ValueError('unknown format %r, use one of %s' % (format, ', '.join(FORMATS)))
+    if compression is not None and format != 'parquet' and compression not in COMPRESSIONS:
+        raise ValueError('unknown compression %r, use one of %s' % (compression, ', '.join(COMPRESSIONS)))
+    return format, compression
+
+
+def _produce(rows, batch_size, batches, stop):
+    """ read rows into batches of batch_size rows and put them in the queue, runs in the producer thread.
+
+        The last item is None, or the exception that ended the rows. Once
+        stop is set nothing more is put and the rows are closed.
+    """
+    def put(item):
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    error = None
+    try:
+        batch = list()
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                if not put(batch):
+                    return
+                batch = list()
+        if batch:
+            put(batch)
+    except BaseException as e:
+        error = e
+    finally:
+        if not put(error) and hasattr(rows, 'close'):
+            rows.close()
+
+
+def _next_batch(batches, producer):
+    """ return the next item of the producer, never waits for a producer that has ended.
+    """
+    while True:
+        try:
+            return batches.get(timeout=0.1)
+        except queue.Empty:
+            if producer.is_alive():
+                continue
+        try:
+            return batches.get_nowait()
+        except queue.Empty:
+            raise RuntimeError('the export producer ended without its last batch')
+
+
+def export(rows, path, fields=None, format=None, compression=None, batch_size=1000, queue_size=8):
+    """ write rows to a file while they are still fetched.
+
+        A producer thread reads the rows into batches while the calling
+        thread writes them. The queue between both holds at most queue_size
+        batches: if the file is written slower than the rows arrive, the
+        producer waits, so at most (queue_size + 2) * batch_size rows are in
+        memory.
+
+    :param rows: Iterable of sequences in the order of fields, or of dictionaries.
+    :param path: Path of the file.
+    :param fields: Names of the columns. Default the keys of the first row, which must be a dictionary.
+    :param format: 'csv', 'jsonl' or 'parquet'. Default the suffix of path.
+    :param compression: 'gzip', 'bz2' or 'xz' for csv and jsonl, default the suffix of path (e.g. .csv.gz).
+        The codec of parquet, e.g. 'zstd' (default 'snappy').
+    :param batch_size: The number of rows written at once.
+    :param queue_size: The number of batches that can wait to be written.
+    :return: ExportResult
+    """
+    start = time.perf_counter()
+    format, compression = _guess(path, format, compression)
+    result = ExportResult(path, format)
+    batches = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    producer = threading.Thread(target=_produce, args=(iter(rows), batch_size, batches, stop), daemon=True)
+    producer.start()
+    writer = None
+    try:
+        while True:
+            batch = _next_batch(batches, producer)
+            if batch is None:
+                break
+            if isinstance(batch, BaseException):
+                raise batch
+            if writer is None:
+                if fields is None:
+                    fields = list(batch[0])
+                result.fields = list(fields)
+                writer = WRITERS[format](path, result.fields, compression)
+            if isinstance(batch[0], dict):
+                batch = [[row.get(field) for field in fields] for row in batch]
+            writer.write(batch)
+            result.rows += len(batch)
+        if writer is None:
+            result.fields = list(fields or ())
+            writer = WRITERS[format](path, result.fields, compression)
+    finally:
+        stop.set()
+        if writer is not None:
+            writer.close()
+        producer.join()
+    result.elapsed = time.perf_counter() - start
+    log.info('export finished: %r' % result)
+    return result
+
+
+def export_list(model, criteria, returns, path, format=None, compression=None, page_size=1000, configname='default',
+                **kwargs):
+    """ export the search results of a model page by page, e.g. export_list(Phone, dict(name='%'), ['name'], 'p.csv').
+
+        The rows are parsed directly into the returned tags, see BaseCUCMModel.iter with form='tuple'.
+        kwargs are passed to export.
+    """
+    rows = model.iter(criteria, returns, page_size=page_size, configname=configname, form='tuple')
+    return export(rows, path, list(returns), format, compression, **kwargs)
+
+
+def export_query(sql, path, format=None, compression=None, chunk_size=5000, key=None, configname='default', **kwargs):
+    """ export the rows of a SELECT statement chunk by chunk, see AXLSQL.iter_query for chunk_size and key.
+
+        The columns are the ones of the first row. kwargs are passed to export.
+    """
+    rows = AXLSQL.get_instance(configname).iter_query(sql, chunk_size=chunk_size, key=key)
+    return export(rows, path, None, format, compression, **kwargs)
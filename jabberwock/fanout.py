@@ -0,0 +1,153 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from zeep.exceptions import Fault
+from jabberwock import exceptions
+from jabberwock.axlsql import AXLSQL
+from jabberwock.configuration import registry
+
+log = logging.getLogger('jabberwock')
+
+
+class ClusterResult(object):
+    """
+    Result of a fan-out call for a single configuration (cluster).
+
+    Attributes:
+        config_name: Name of the configuration.
+        value: Return value of the call if it succeeded.
+        exception: Exception raised by the call, ClusterTimeoutException if it did not finish in time.
+        elapsed: Duration of the call in seconds.
+    """
+
+    def __init__(self, config_name, value=None, exception=None, elapsed=0.0):
+        self.config_name = config_name
+        self.value = value
+        self.exception = exception
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.exception is None
+
+    def __repr__(self):
+        state = 'ok' if self.ok else repr(self.exception)
+        return '<ClusterResult %s %s %.3fs>' % (self.config_name, state, self.elapsed)
+
+
+def _timeout(timeout, config_name):
+    if isinstance(timeout, dict):
+        return timeout.get(config_name)
+    return timeout
+
+
+def fan_out(func, config_names=None, timeout=None):
+    """ call func(config_name) for several configurations at the same time.
+
+        A failing or slow configuration does not hold up the others: its
+        result carries the exception, or a ClusterTimeoutException once its
+        timeout is over. A timed out call is abandoned, not interrupted.
+
+    :param func: Function called with the name of a configuration.
+    :param config_names: Names of the configurations, default all registered configurations.
+    :param timeout: Seconds per configuration, or a dictionary of configuration names and seconds. None for no limit.
+    :return: List of ClusterResult in the order of config_names.
+    """
+    config_names = list(config_names) if config_names is not None else registry.names()
+    if not config_names:
+        return []
+
+    def run(config_name):
+        start = time.perf_counter()
+        return func(config_name), time.perf_counter() - start
+
+    executor = ThreadPoolExecutor(max_workers=len(config_names))
+    start = time.monotonic()
+    try:
+        futures = [(name, executor.submit(run, name)) for name in config_names]
+        results = list()
+        for name, future in futures:
+            limit = _timeout(timeout, name)
+            remaining = None if limit is None else max(0.0, start + limit - time.monotonic())
+            try:
+                value, elapsed = future.result(remaining)
+            except TimeoutError:
+                log.info('%s did not answer within %ss' % (name, limit))
+                error = exceptions.ClusterTimeoutException('%s did not answer within %ss' % (name, limit))
+                results.append(ClusterResult(name, exception=error, elapsed=time.monotonic() - start))
+            except Exception as e:
+                log.info('fan-out call to %s failed: %s' % (name, e))
+                results.append(ClusterResult(name, exception=e, elapsed=time.monotonic() - start))
+            else:
+                results.append(ClusterResult(name, value=value, elapsed=elapsed))
+        return results
+    finally:
+        executor.shutdown(wait=False)
+
+
+def _is_not_found(fault):
+    return 'was not found' in str(fault.message)
+
+
+def get_all(model, config_names=None, timeout=None, **kwargs):
+    """ get an object from several configurations, e.g. get_all(User, userid='ckent').
+
+        The value of a result is None if the object does not exist in that configuration.
+        Any other AXL fault is the exception of the result.
+    """
+    def get(config_name):
+        obj = model.__new__(model)
+        obj._configure(config_name=config_name)
+        criteria = obj._get_criteria(kwargs)
+        if not criteria:
+            raise ValueError('get_all needs search criteria of %s' % obj.__name__)
+        try:
+            obj._load_existing(criteria, kwargs.get('returns'))
+        except Fault as fault:
+            if _is_not_found(fault):
+                return None
+            raise
+        obj._prepare_update()
+        return obj
+
+    return fan_out(get, config_names, timeout)
+
+
+def list_all(model, criteria, returns, config_names=None, timeout=None, **kwargs):
+    """ search objects in several configurations, see BaseCUCMModel.list for criteria, returns and kwargs.
+
+        The value of a result is the list of rows (or the columns with form='columns').
+    """
+    def search(config_name):
+        result = model.list(criteria, returns, configname=config_name, **kwargs)
+        return result if isinstance(result, (list, dict)) else list(result)
+
+    return fan_out(search, config_names, timeout)
+
+
+def query_all(sql, config_names=None, timeout=None, **kwargs):
+    """ run a SELECT statement in several configurations, see AXLSQL.iter_query for kwargs.
+
+        The value of a result is the list of rows.
+    """
+    return fan_out(lambda config_name: list(AXLSQL.get_instance(config_name).iter_query(sql, **kwargs)), config_names, timeout)
+
+
+def rows(results):
+    """ merge the rows of successful list_all or query_all results, yield (config_name, row) tuples.
+        Results of list_all with form='columns' are transposed to one dictionary per row.
+    """
+    for result in results:
+        if result.ok and result.value is not None:
+            value = result.value
+            if isinstance(value, dict):
+                names = list(value)
+                value = (dict(zip(names, row)) for row in zip(*(value[name] for name in names)))
+            for row in value:
+                yield result.config_name, row
+
+
+def found(results):
+    """ return the successful results with a value, e.g. the configurations where get_all found the object.
+    """
+    return [result for result in results if result.ok and result.value is not None]
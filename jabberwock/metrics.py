@@ -0,0 +1,289 @@
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import Counter, deque
+from zeep.exceptions import Fault
+from zeep.transports import Transport
+
+try:
+    from zeep.transports import AsyncTransport
+except ImportError:
+    AsyncTransport = None
+
+log = logging.getLogger('jabberwock')
+
+PHASES = ('serialize', 'network', 'parse')
+SUMMARY_FIELDS = ('total_time', 'serialize_time', 'network_time', 'parse_time', 'request_bytes', 'response_bytes')
+
+_current = contextvars.ContextVar('jabberwock_call', default=None)
+
+
+class CallMetrics(object):
+    """ Measurements of a single AXL call, including all its retries.
+
+        The time of every attempt is split into the serialization of the
+        request, the network round trip and the parsing of the response.
+    """
+
+    __slots__ = ('config_name', 'operation', 'started', 'total_time', 'serialize_time', 'network_time', 'parse_time',
+                 'request_bytes', 'response_bytes', 'attempts', 'error', 'fault_code', '_phase', '_mark')
+
+    def __init__(self, config_name, operation):
+        self.config_name = config_name
+        self.operation = operation
+        self.started = time.time()
+        self.total_time = 0.0
+        self.serialize_time = 0.0
+        self.network_time = 0.0
+        self.parse_time = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.attempts = 0
+        self.error = None
+        self.fault_code = None
+        self._phase = None
+        self._mark = None
+
+    @property
+    def retries(self):
+        return max(0, self.attempts - 1)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def _lap(self, phase):
+        """ add the time since the last mark to the current phase and continue with the given phase.
+        """
+        now = time.perf_counter()
+        if self._phase is not None:
+            attr = self._phase + '_time'
+            setattr(self, attr, getattr(self, attr) + now - self._mark)
+        self._phase, self._mark = phase, now
+
+    def sent(self, size):
+        """ the serialized request is sent to CUCM.
+        """
+        self.request_bytes += size
+        self._lap('network')
+
+    def received(self, size):
+        """ the response was received from CUCM.
+        """
+        self.response_bytes += size
+        self._lap('parse')
+
+    def failed(self, error):
+        self.error = type(error).__name__
+        if isinstance(error, Fault):
+            code = error.detail.findtext('.//axlcode') if error.detail is not None else None
+            self.fault_code = code or error.code
+
+    def measure(self, func):
+        """ return func wrapped to measure every attempt of the call.
+        """
+        def attempt(*args, **kwargs):
+            self.attempts += 1
+            self._lap('serialize')
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._lap(None)
+        return attempt
+
+    def ameasure(self, func):
+        """ asynchronous variant of measure.
+        """
+        async def attempt(*args, **kwargs):
+            self.attempts += 1
+            self._lap('serialize')
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self._lap(None)
+        return attempt
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in ('config_name', 'operation', 'started', 'attempts', 'retries',
+                                                      'error', 'fault_code') + SUMMARY_FIELDS}
+
+    def __repr__(self):
+        return '<CallMetrics %s %.3fs %d/%d bytes%s>' % (self.operation, self.total_time, self.request_bytes,
+                                                        self.response_bytes, ' ' + self.error if self.error else '')
+
+
+def current_call():
+    """ return the metrics of the AXL call running in the current thread or task, or None.
+    """
+    return _current.get()
+
+
+class MeteredTransport(Transport):
+    """ Transport which reports the request and response sizes and the network time to the running call.
+    """
+
+    def post(self, address, message, headers):
+        call = _current.get()
+        if call is None:
+            return super().post(address, message, headers)
+        call.sent(len(message))
+        response = super().post(address, message, headers)
+        call.received(len(response.content))
+        return response
+
+
+if AsyncTransport is not None:
+    class MeteredAsyncTransport(AsyncTransport):
+        """ Asynchronous variant of the MeteredTransport.
+        """
+
+        async def post(self, address, message, headers):
+            call = _current.get()
+            if call is None:
+                return await super().post(address, message, headers)
+            call.sent(len(message))
+            response = await super().post(address, message, headers)
+            call.received(len(response.content))
+            return response
+
+
+class Recorder(object):
+    """ Measure the AXL calls of a configuration and pass the results to a collector.
+
+    :param collector: Object with a record(call) method or a callable which gets the CallMetrics of every call.
+    :param config_name: Name of the configuration.
+    """
+
+    def __init__(self, collector, config_name):
+        self.collector = collector if hasattr(collector, 'record') else CallbackCollector(collector)
+        self.config_name = config_name
+
+    def call(self, name, throttle, operation, *args, **kwargs):
+        call = CallMetrics(self.config_name, name)
+        token = _current.set(call)
+        start = time.perf_counter()
+        try:
+            return throttle.call(name, call.measure(operation), *args, **kwargs)
+        except Exception as e:
+            call.failed(e)
+            raise
+        finally:
+            call.total_time = time.perf_counter() - start
+            _current.reset(token)
+            self.record(call)
+
+    async def acall(self, name, throttle, operation, *args, **kwargs):
+        call = CallMetrics(self.config_name, name)
+        token = _current.set(call)
+        start = time.perf_counter()
+        try:
+            return await throttle.acall(name, call.ameasure(operation), *args, **kwargs)
+        except Exception as e:
+            call.failed(e)
+            raise
+        finally:
+            call.total_time = time.perf_counter() - start
+            _current.reset(token)
+            self.record(call)
+
+    def record(self, call):
+        try:
+            self.collector.record(call)
+        except Exception:
+            log.exception('unable to record metrics of %s' % call.operation)
+
+
+class CallbackCollector(object):
+    """ Pass the metrics of every call to a function, e.g. to feed an external metrics system.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def record(self, call):
+        self.callback(call)
+
+
+def percentile(values, p):
+    """ return the p-th percentile (nearest rank) of sorted values.
+    """
+    if not values:
+        return None
+    return values[max(0, min(len(values), math.ceil(p / 100.0 * len(values))) - 1)]
+
+
+class _OperationStats(object):
+
+    def __init__(self, samples):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.faults = Counter()
+        self.samples = {name: deque(maxlen=samples) for name in SUMMARY_FIELDS}
+
+    def add(self, call):
+        self.calls += 1
+        self.retries += call.retries
+        self.request_bytes += call.request_bytes
+        self.response_bytes += call.response_bytes
+        if call.error is not None:
+            self.errors += 1
+            self.faults[call.fault_code or call.error] += 1
+        for name, samples in self.samples.items():
+            samples.append(getattr(call, name))
+
+
+class MemoryCollector(object):
+    """ Aggregate the metrics of all calls in memory, per configuration and operation.
+
+        Counters are kept for all calls, percentiles are computed over the
+        last `samples` calls of an operation.
+
+    :param samples: Number of calls per operation kept for the percentiles.
+    :param percentiles: Percentiles reported by summary.
+    """
+
+    def __init__(self, samples=1024, percentiles=(50, 90, 99)):
+        self.samples = samples
+        self.percentiles = percentiles
+        self.stats = dict()
+        self.lock = threading.Lock()
+
+    def record(self, call):
+        key = (call.config_name, call.operation)
+        with self.lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = _OperationStats(self.samples)
+            stats.add(call)
+
+    def counters(self):
+        """ return the counters by (configuration, operation).
+        """
+        with self.lock:
+            return {key: dict(calls=stats.calls, errors=stats.errors, retries=stats.retries,
+                              request_bytes=stats.request_bytes, response_bytes=stats.response_bytes,
+                              faults=dict(stats.faults))
+                    for key, stats in self.stats.items()}
+
+    def summary(self):
+        """ return the counters and percentiles of the measurements by (configuration, operation).
+
+            e.g. {('default', 'getUser'): {'calls': 10, ..., 'percentiles': {'network_time': {50: 0.05, 90: 0.08}}}}
+        """
+        with self.lock:
+            samples = {key: {name: sorted(values) for name, values in stats.samples.items()}
+                       for key, stats in self.stats.items()}
+        result = self.counters()
+        for key, fields in samples.items():
+            result[key]['percentiles'] = {name: {p: percentile(values, p) for p in self.percentiles}
+                                          for name, values in fields.items()}
+        return result
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from zeep.exceptions import Fault
+from zeep.helpers import serialize_object
+from jabberwock import utils
+from jabberwock.axlhandler import AXLClient
+
+log = logging.getLogger('jabberwock')
+
+PF_GET = 'get'
+
+
+class SyncResult(object):
+    """
+    Result of the synchronization of an object type.
+
+    Attributes:
+        name: Name of the object type (e.g. Phone).
+        added: uuids of new objects.
+        changed: uuids of changed objects.
+        removed: uuids of removed objects, which the criteria no longer returns and no other criteria holds.
+        failed: uuids of new or changed objects that could not be fetched, they are fetched again by the next sync.
+        unchanged: Number of unchanged objects.
+        elapsed: Duration of the synchronization in seconds.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.added = list()
+        self.changed = list()
+        self.removed = list()
+        self.failed = list()
+        self.unchanged = 0
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        return '<SyncResult %s added=%d changed=%d removed=%d failed=%d unchanged=%d %.1fs>' % (
+            self.name, len(self.added), len(self.changed), len(self.removed), len(self.failed), self.unchanged,
+            self.elapsed)
+
+
+class Mirror(object):
+    """
+    Local copy of CUCM objects of a configuration in a sqlite file.
+
+    The mirror is updated incrementally: the objects are listed with a few lightweight tags and a hash of those tags
+    is compared with the hash stored in the mirror. Only new and changed objects are fetched with get.
+
+    The mirror remembers which objects every search criteria returned. Objects that the same criteria no longer
+    returns are removed, unless another criteria still returns them, so syncs with different criteria (e.g. one per
+    device pool) don't remove each other's objects.
+
+    :param path: Path of the sqlite file.
+    :param config_name: Name of the configuration.
+    """
+
+    def __init__(self, path, config_name='default'):
+        self.path = path
+        self.config_name = config_name
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute('CREATE TABLE IF NOT EXISTS objects (name TEXT, uuid TEXT, digest TEXT, '
+                                    'data TEXT, synced REAL, PRIMARY KEY (name, uuid))')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS syncs (name TEXT PRIMARY KEY, synced REAL, '
+                                    'added INTEGER, changed INTEGER, removed INTEGER)')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS members (name TEXT, scope TEXT, uuid TEXT, '
+                                    'PRIMARY KEY (name, scope, uuid))')
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type=None, exc_value=None, traceback=None):
+        self.close()
+
+    @staticmethod
+    def _scope(criteria):
+        return json.dumps(criteria, sort_keys=True, default=str)
+
+    @staticmethod
+    def _digest(values):
+        return hashlib.sha1(json.dumps(list(values), default=str).encode()).hexdigest()
+
+    def sync(self, model, criteria, fields, fetch=True, page_size=1000, concurrency=4):
+        """ update the mirror of an object type.
+
+        :param model: CUCM model class, e.g. ccm.Phone.
+        :param criteria: Dictionary of search criteria of the list operation, e.g. dict(name='%').
+        :param fields: Tags of the list operation whose change means that the object changed.
+        :param fetch: True to store the full objects fetched with get, False to store only the listed fields.
+        :param page_size: The number of results fetched with one list call.
+        :param concurrency: Number of get calls running at the same time.
+        :return: SyncResult
+        """
+        start = time.perf_counter()
+        name = model.__name__
+        result = SyncResult(name)
+        fields = [f for f in fields if f != 'uuid'] + ['uuid']
+        scope = self._scope(criteria)
+        known = dict(self.connection.execute('SELECT uuid, digest FROM objects WHERE name = ?', (name,)))
+        members = {uuid for uuid, in self.connection.execute('SELECT uuid FROM members WHERE name = ? AND scope = ?',
+                                                             (name, scope))}
+        listed, pending = list(), list()
+        for row in model.iter(criteria, fields, page_size=page_size, configname=self.config_name, form='tuple'):
+            values = row[:-1]
+            uuid = row[-1]
+            digest = self._digest(values)
+            members.discard(uuid)
+            listed.append(uuid)
+            stored = known.get(uuid)
+            if stored == digest:
+                result.unchanged += 1
+                continue
+            (result.changed if stored is not None else result.added).append(uuid)
+            pending.append((uuid, digest, dict(zip(fields, row))))
+        if fetch:
+            loaded = utils.imap_bounded(lambda item: self._fetch(model, item), pending, concurrency)
+        else:
+            loaded = ((uuid, digest, data) for (uuid, digest, data) in pending)
+        now = time.time()
+        with self.connection:
+            failed = set()
+            for uuid, digest, data in loaded:
+                if data is None:
+                    # keep a changed object as it is, its old digest makes the next sync fetch it again
+                    (result.added if uuid in result.added else result.changed).remove(uuid)
+                    result.failed.append(uuid)
+                    failed.add(uuid)
+                    continue
+                self.connection.execute('INSERT OR REPLACE INTO objects (name, uuid, digest, data, synced) '
+                                        'VALUES (?, ?, ?, ?, ?)',
+                                        (name, uuid, digest, json.dumps(data, default=str), now))
+            self.connection.executemany('INSERT OR IGNORE INTO members (name, scope, uuid) VALUES (?, ?, ?)',
+                                        [(name, scope, uuid) for uuid in listed if uuid in known or uuid not in failed])
+            self.connection.executemany('DELETE FROM members WHERE name = ? AND scope = ? AND uuid = ?',
+                                        [(name, scope, uuid) for uuid in members])
+            for uuid in sorted(members):
+                held = self.connection.execute('SELECT 1 FROM members WHERE name = ? AND uuid = ?',
+                                               (name, uuid)).fetchone()
+                if held is None:
+                    self.connection.execute('DELETE FROM objects WHERE name = ? AND uuid = ?', (name, uuid))
+                    result.removed.append(uuid)
+            self.connection.execute('INSERT OR REPLACE INTO syncs (name, synced, added, changed, removed) '
+                                    'VALUES (?, ?, ?, ?, ?)',
+                                    (name, now, len(result.added), len(result.changed), len(result.removed)))
+        result.elapsed = time.perf_counter() - start
+        log.info('mirror of %s synced: %r' % (name, result))
+        return result
+
+    def _fetch(self, model, item):
+        """ return the uuid, digest and full object as dictionary, the data is None if the object no longer exists.
+        """
+        uuid, digest, _ = item
+        client = AXLClient.get_client(self.config_name)
+        try:
+            response = model._axl_operation(PF_GET, model.__name__, client)(uuid=uuid)
+        except Fault as fault:
+            log.info('unable to fetch %s %s: %s' % (model.__name__, uuid, fault))
+            return uuid, digest, None
+        obj = response['return'][model._first_lower(model.__name__)]
+        return uuid, digest, serialize_object(obj, dict)
+
+    def get(self, name, uuid):
+        """ return the stored object as dictionary or None.
+        """
+        row = self.connection.execute('SELECT data FROM objects WHERE name = ? AND uuid = ?', (name, uuid)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def all(self, name):
+        """ yield all stored objects of a type as dictionaries.
+        """
+        for data, in self.connection.execute('SELECT data FROM objects WHERE name = ?', (name,)):
+            yield json.loads(data)
+
+    def find(self, name, **values):
+        """ yield the stored objects of a type whose tags have the given values.
+
+            A reference (e.g. devicePoolName) matches its name.
+            e.g. mirror.find('Phone', devicePoolName='Default')
+        """
+        sql = 'SELECT data FROM objects WHERE name = ?'
+        params = [name]
+        for tag, value in values.items():
+            if not tag.isidentifier():
+                raise ValueError('invalid tag %r' % tag)
+            sql += " AND COALESCE(json_extract(data, '$.%s._value_1'), json_extract(data, '$.%s')) = ?" % (tag, tag)
+            params.append(value)
+        for data, in self.connection.execute(sql, params):
+            yield json.loads(data)
+
+    def last_sync(self, name):
+        """ return the time of the last synchronization of a type or None.
+        """
+        row = self.connection.execute('SELECT synced FROM syncs WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
@@ -0,0 +1,215 @@
+import io
+import keyword
+import multiprocessing
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
+from jabberwock import utils
+
+FORMS = ('tuple', 'columns')
+CHUNK_SIZE = 1 << 20
+DELIMITERS = b' \t\r\n/>'
+
+_row_types = dict()
+_row_types_lock = threading.Lock()
+_pools = dict()
+_pools_lock = threading.Lock()
+
+
+def field_name(tag):
+    """ return the attribute name of a tag, python keywords (e.g. class) get a trailing underscore.
+    """
+    return tag + '_' if keyword.iskeyword(tag) else tag
+
+
+def row_type(name, fields):
+    """ return a named tuple class for the rows of an object type with the given fields.
+        The classes are created once per type and fields.
+    """
+    key = (name, tuple(fields))
+    cls = _row_types.get(key)
+    if cls is None:
+        with _row_types_lock:
+            cls = _row_types.setdefault(key, namedtuple(name + 'Row', [field_name(f) for f in fields]))
+    return cls
+
+
+def raise_for_fault(client, name, response):
+    """ raise the Fault (or TransportError) of a raw response the same way zeep does.
+    """
+    if response.status_code == 200:
+        return
+    binding = client.axl._binding
+    binding.process_reply(client, binding.get(name), response)
+
+
+def _localname(tag):
+    return tag.rsplit('}', 1)[-1] if tag[:1] == '{' else tag
+
+
+def _value(element):
+    if len(element):
+        return utils.elements_to_dict(element)
+    return element.text
+
+
+def _iter_elements(content, tag):
+    """ yield every <tag> element below <return>, each element is released when the next one is read.
+    """
+    for _, element in etree.iterparse(io.BytesIO(content), events=('end',), tag='{*}' + tag, huge_tree=True):
+        parent = element.getparent()
+        if parent is None or _localname(parent.tag) != 'return':
+            continue
+        yield element
+        element.clear()
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def iter_rows(content, tag, fields):
+    """ yield a list with the values of the fields for every <tag> element of a list response.
+
+        The response is parsed incrementally and every row element is
+        released once its values are extracted, so no tree of the full
+        response is built. The uuid is read from the attribute of the row.
+    """
+    positions = {f: i for (i, f) in enumerate(fields)}
+    uuid_position = positions.get('uuid')
+    for element in _iter_elements(content, tag):
+        values = [None] * len(fields)
+        if uuid_position is not None:
+            values[uuid_position] = element.get('uuid')
+        for child in element:
+            if not isinstance(child.tag, str):
+                continue
+            position = positions.get(_localname(child.tag))
+            if position is not None:
+                values[position] = _value(child)
+        yield values
+
+
+def iter_sql_rows(content):
+    """ yield a dictionary of column names and text values for every row of an executeSQLQuery response.
+    """
+    for element in _iter_elements(content, 'row'):
+        yield {_localname(child.tag): child.text for child in element if isinstance(child.tag, str)}
+
+
+def _starts_row(content, position, opening):
+    """ return True if a <tag> element starts at position, after optional white space.
+    """
+    while content[position:position + 1].isspace():
+        position += 1
+    if not content.startswith(opening, position):
+        return False
+    return content[position + len(opening):position + len(opening) + 1] in DELIMITERS
+
+
+def split_rows(content, tag, size=None):
+    """ split a list or SQL response into documents of about size bytes with a part of the <tag> rows each.
+
+        Every document keeps the envelope around the rows, so it parses like
+        the full response. The rows are split only where a </tag> is directly
+        followed by the next <tag>. A response with prefixed row tags, or one
+        that is not larger than size, is returned as it is. size defaults to CHUNK_SIZE.
+    """
+    return list(iter_split_rows(content, tag, size))
+
+
+def iter_split_rows(content, tag, size=None):
+    """ yield the documents of split_rows one by one, only the next one is copied from content.
+    """
+    if size is None:
+        size = CHUNK_SIZE
+    opening, closing = b'<' + tag.encode(), b'</' + tag.encode() + b'>'
+    start = content.find(b'<return>')
+    end = content.rfind(b'</return>')
+    if len(content) <= size or start < 0 or end < start:
+        yield content
+        return
+    start += len(b'<return>')
+    head, tail = content[:start], content[end:]
+    while end - start > size:
+        boundary = content.find(closing, start + size, end)
+        while boundary >= 0 and not _starts_row(content, boundary + len(closing), opening):
+            boundary = content.find(closing, boundary + len(closing), end)
+        if boundary < 0:
+            break
+        split = boundary + len(closing)
+        yield head + content[start:split] + tail
+        start = split
+    yield head + content[start:end] + tail
+
+
+def get_pool(processes):
+    """ return the process pool with the given number of processes, it is created on first use and shared.
+        The processes are spawned, forking a process with running threads (e.g. the AXL clients) is not safe.
+    """
+    pool = _pools.get(processes)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(processes)
+            if pool is None:
+                context = multiprocessing.get_context('spawn')
+                pool = _pools[processes] = ProcessPoolExecutor(max_workers=processes, mp_context=context)
+    return pool
+
+
+def _parse_chunk(content, tag, fields):
+    """ parse a document of split_rows into plain rows, runs in the process pool.
+    """
+    if fields is None:
+        return list(iter_sql_rows(content))
+    return list(iter_rows(content, tag, fields))
+
+
+def iter_rows_parallel(content, tag, fields, processes):
+    """ yield the rows of a large response parsed in a pool of processes, in the order of the response.
+
+        The response is cut into documents of CHUNK_SIZE bytes with split_rows,
+        so the XML parsing of several chunks does not share the GIL. The rows
+        of every chunk come back as soon as it is parsed. At most 2 * processes
+        chunks are copied and submitted ahead of the rows that are yielded, so
+        the chunks do not hold a second copy of the whole response. Rows are the
+        lists of iter_rows, or the dictionaries of iter_sql_rows if fields is None.
+    """
+    chunks = iter_split_rows(content, tag)
+    first, second = next(chunks), next(chunks, None)
+    if second is None:
+        yield from _parse_chunk(first, tag, fields)
+        return
+    pool = get_pool(processes)
+    pending = deque(pool.submit(_parse_chunk, chunk, tag, fields) for chunk in (first, second))
+    first = second = None
+    try:
+        for chunk in chunks:
+            if len(pending) >= 2 * processes:
+                yield from pending.popleft().result()
+            pending.append(pool.submit(_parse_chunk, chunk, tag, fields))
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def parse_rows(content, name, tag, fields, form, processes=None):
+    """ parse a list response into named tuples ('tuple') or a dict of columns ('columns').
+
+        With processes, large responses are parsed in a pool of that many processes, see iter_rows_parallel.
+    """
+    if processes:
+        rows = iter_rows_parallel(content, tag, fields, processes)
+    else:
+        rows = iter_rows(content, tag, fields)
+    if form == 'tuple':
+        cls = row_type(name, fields)
+        return [cls._make(values) for values in rows]
+    if form == 'columns':
+        columns = [list() for _ in fields]
+        for values in rows:
+            for column, value in zip(columns, values):
+                column.append(value)
+        return dict(zip(fields, columns))
+    raise ValueError('unknown form %r, use one of %s' % (form, ', '.join(FORMS)))
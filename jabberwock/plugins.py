@@ -0,0 +1,75 @@
+import contextvars
+import time
+from collections import deque
+from zeep import Plugin
+from zeep.plugins import HistoryPlugin
+
+
+class SummaryPlugin(Plugin):
+    """ Keep the sizes and timings of the last AXL calls without the envelopes.
+
+        Unlike the HistoryPlugin, no XML tree is referenced after a call, so
+        large responses are released as soon as the result is extracted.
+        The rows of a response are the children of its <return> element.
+
+    :param maxlen: Number of calls kept.
+    :param count_elements: Also count all elements of every envelope, which walks the whole response.
+    """
+
+    def __init__(self, maxlen=100, count_elements=False):
+        self.calls = deque(maxlen=maxlen)
+        self.count_elements = count_elements
+        self._sent = contextvars.ContextVar('jabberwock_sent', default=None)
+
+    def egress(self, envelope, http_headers, operation, binding_options):
+        self._sent.set((time.perf_counter(), _count_elements(envelope) if self.count_elements else None))
+        return envelope, http_headers
+
+    def ingress(self, envelope, http_headers, operation):
+        sent = self._sent.get()
+        elapsed, request_elements = (time.perf_counter() - sent[0], sent[1]) if sent else (None, None)
+        length = http_headers.get('Content-Length') if http_headers is not None else None
+        call = dict(operation=operation.name, received=time.time(), elapsed=elapsed,
+                    response_rows=_count_rows(envelope), response_bytes=int(length) if length else None)
+        if self.count_elements:
+            call.update(request_elements=request_elements, response_elements=_count_elements(envelope))
+        self.calls.append(call)
+        return envelope, http_headers
+
+    @property
+    def last(self):
+        return self.calls[-1] if self.calls else None
+
+
+DEBUG_PLUGINS = (HistoryPlugin, SummaryPlugin)
+
+
+def _count_elements(envelope):
+    return sum(1 for _ in envelope.iter())
+
+
+def _count_rows(envelope):
+    body = envelope.find('{*}Body')
+    if body is None or not len(body):
+        return None
+    result = body[0].find('{*}return')
+    return len(result) if result is not None else None
+
+
+def create_plugins(transport_debugger):
+    """ return the zeep plugins for the transport_debugger setting.
+
+        False (default): no plugin, nothing is kept after a call.
+        True or 'envelopes': the HistoryPlugin, which keeps the last sent and received envelope.
+        'summary': the SummaryPlugin, which keeps the sizes and timings of the last calls.
+        'summary_elements': the SummaryPlugin, which also counts all elements of every envelope.
+    """
+    if not transport_debugger:
+        return []
+    if transport_debugger is True or transport_debugger == 'envelopes':
+        return [HistoryPlugin()]
+    if transport_debugger == 'summary':
+        return [SummaryPlugin()]
+    if transport_debugger == 'summary_elements':
+        return [SummaryPlugin(count_elements=True)]
+    raise ValueError('unknown transport_debugger %r' % (transport_debugger,))
@@ -0,0 +1,208 @@
+import argparse
+import copyreg
+import hashlib
+import io
+import logging
+import os
+import pickle
+import re
+import sys
+import tempfile
+import zeep
+from lxml import etree
+from zeep.settings import Settings
+from zeep.transports import Transport
+from zeep.wsdl import Document
+
+log = logging.getLogger('jabberwock')
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_NAME = 'AXLAPI.snapshot'
+SCHEMA_SUFFIXES = ('.wsdl', '.xsd')
+DYNAMIC_MODULES = ('zeep.objects', 'zeep.xsd.dynamic_types')
+# pickling the runtime classes of zeep needs reducer_override (python 3.8), a parsed Document is accepted by
+# zeep.Client since zeep 4.2
+MIN_PYTHON = (3, 8)
+MIN_ZEEP = (4, 2)
+
+
+def zeep_version():
+    return tuple(int(i) for i in re.findall(r'\d+', zeep.__version__)[:2])
+
+
+def snapshot_supported():
+    """ return True if schema snapshots can be written and used with this python and zeep version.
+    """
+    return sys.version_info >= MIN_PYTHON and zeep_version() >= MIN_ZEEP
+
+
+def wsdl_location(schema_path, version):
+    """ return the location of the AXL WSDL for the given schema version.
+    """
+    return 'file://' + schema_path + '/' + version + '/AXLAPI.wsdl'
+
+
+def default_snapshot_path(schema_path, version):
+    """ return the default location of a snapshot, next to the schema files.
+    """
+    return os.path.join(schema_path, version, SNAPSHOT_NAME)
+
+
+def schema_digest(schema_path, version):
+    """ return a hash over all schema files of a version.
+
+        The hash also covers the snapshot format and the zeep version,
+        because the pickled objects depend on both.
+    """
+    directory = os.path.join(schema_path, version)
+    digest = hashlib.sha256()
+    digest.update(('%s:%s' % (SNAPSHOT_FORMAT, zeep.__version__)).encode())
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(SCHEMA_SUFFIXES):
+            continue
+        digest.update(name.encode())
+        with open(os.path.join(directory, name), 'rb') as fp:
+            for block in iter(lambda: fp.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _reduce_qname(qname):
+    return etree.QName, (qname.text,)
+
+
+def _reduce_element(element):
+    return etree.fromstring, (etree.tostring(element),)
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """ Pickler for parsed WSDL documents.
+
+        zeep creates a class per schema type at runtime, those classes are
+        rebuilt on load. The transport and settings are not part of the
+        snapshot, they are provided again by the loading client.
+    """
+
+    dispatch_table = copyreg.dispatch_table.copy()
+    dispatch_table[etree.QName] = _reduce_qname
+    dispatch_table[etree._Element] = _reduce_element
+
+    def __init__(self, file, transport, settings):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.transport = transport
+        self.settings = settings
+
+    def reducer_override(self, obj):
+        if isinstance(obj, type) and obj.__module__ in DYNAMIC_MODULES:
+            attrs = {k: v for (k, v) in vars(obj).items() if k not in ('__dict__', '__weakref__', '__doc__')}
+            return type, (obj.__name__, obj.__bases__, attrs)
+        return NotImplemented
+
+    def persistent_id(self, obj):
+        if obj is self.transport:
+            return 'transport'
+        if obj is self.settings:
+            return 'settings'
+        return None
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+
+    def __init__(self, file, transport, settings):
+        super().__init__(file)
+        self.references = dict(transport=transport, settings=settings)
+
+    def persistent_load(self, pid):
+        return self.references[pid]
+
+
+def _check_supported():
+    if not snapshot_supported():
+        raise RuntimeError('schema snapshots require python %s and zeep %s or newer' % (
+            '.'.join(map(str, MIN_PYTHON)), '.'.join(map(str, MIN_ZEEP))))
+
+
+def _defaults(transport, settings):
+    return transport or Transport(), settings or Settings(strict=False, xml_huge_tree=True)
+
+
+def compile_schema(schema_path, version, target=None, transport=None, settings=None):
+    """ parse the AXL schema of a version and write it as snapshot.
+
+    :param schema_path: Path of the schema directory.
+    :param version: Version of the schema, e.g. '12.5'.
+    :param target: Path of the snapshot file. Defaults to a file next to the schema files.
+    :param transport: Transport used to parse the WSDL.
+    :param settings: zeep settings used to parse the WSDL.
+    :return: The parsed WSDL document.
+    """
+    _check_supported()
+    transport, settings = _defaults(transport, settings)
+    document = parse_schema(schema_path, version, transport, settings)
+    write_schema(document, schema_path, version, target, transport, settings)
+    return document
+
+
+def parse_schema(schema_path, version, transport=None, settings=None):
+    """ parse the AXL WSDL of a version into a document that write_schema can store.
+    """
+    transport, settings = _defaults(transport, settings)
+    return Document(wsdl_location(schema_path, version), transport, settings=settings)
+
+
+def write_schema(document, schema_path, version, target=None, transport=None, settings=None):
+    """ write a document of parse_schema as snapshot, transport and settings must be the ones it was parsed with.
+    """
+    _check_supported()
+    target = target or default_snapshot_path(schema_path, version)
+    header = dict(format=SNAPSHOT_FORMAT, version=version, digest=schema_digest(schema_path, version))
+    buffer = io.BytesIO()
+    pickle.dump(header, buffer, protocol=pickle.HIGHEST_PROTOCOL)
+    _SnapshotPickler(buffer, transport, settings).dump(document)
+    directory = os.path.dirname(os.path.abspath(target))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.' + SNAPSHOT_NAME)
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(buffer.getvalue())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    log.info('schema %s compiled to %s' % (version, target))
+
+
+def load_schema(schema_path, version, path=None, transport=None, settings=None):
+    """ load a snapshot written by compile_schema.
+
+        Return None if there is no snapshot, if it does not match the
+        current schema files, zeep version or snapshot format, or if it
+        can't be read completely (e.g. a truncated file).
+    """
+    path = path or default_snapshot_path(schema_path, version)
+    if not snapshot_supported() or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as fp:
+            header = pickle.load(fp)
+            if not isinstance(header, dict) or header.get('format') != SNAPSHOT_FORMAT or \
+                    header.get('version') != version or header.get('digest') != schema_digest(schema_path, version):
+                log.info('schema snapshot %s is stale' % path)
+                return None
+            return _SnapshotUnpickler(fp, transport, settings).load()
+    except Exception as e:
+        log.warning('schema snapshot %s is unreadable: %s' % (path, e))
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile an AXL schema version into a snapshot.')
+    parser.add_argument('schema_path', help='path of the schema directory')
+    parser.add_argument('version', help='schema version, e.g. 12.5')
+    parser.add_argument('target', nargs='?', help='path of the snapshot file')
+    args = parser.parse_args()
+    compile_schema(args.schema_path, args.version, args.target)
+
+
+if __name__ == "__main__":
+    main()
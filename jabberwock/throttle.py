@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import random
+import re
+import threading
+import time
+from zeep.exceptions import Fault, TransportError
+from jabberwock import exceptions
+
+log = logging.getLogger('jabberwock')
+
+REGEX_THROTTLED = re.compile(r'throttl|Maximum AXL Memory Allocation|Service Unavailable|too many requests',
+                             re.IGNORECASE)
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def is_throttled(error):
+    """ return True if the error says that CUCM throttled the request.
+    """
+    if isinstance(error, TransportError):
+        return error.status_code in THROTTLE_STATUS_CODES
+    if isinstance(error, Fault):
+        return REGEX_THROTTLED.search(str(error.message)) is not None
+    return False
+
+
+class TokenBucket(object):
+    """ Token bucket rate limiter.
+
+        Every call takes a token. Tokens are refilled with `rate` per second
+        up to `burst` tokens. If no token is left the caller has to wait.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.burst
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """ take a token and return the number of seconds to wait before it can be used.
+        """
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay:
+            self.sleep(delay)
+
+
+class AdaptiveConcurrency(object):
+    """ Limit the number of calls running at the same time.
+
+        The limit is halved when CUCM throttles a call and grows again by one
+        for every `limit` successful calls (additive increase, multiplicative
+        decrease). Threads wait on a condition, coroutines on a future which
+        release resolves in the loop of the coroutine.
+    """
+
+    def __init__(self, maximum, minimum=1):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(maximum)
+        self.running = 0
+        self.condition = threading.Condition()
+        self.waiters = []
+
+    def try_acquire(self):
+        with self.condition:
+            if self.running >= int(self.limit):
+                return False
+            self.running += 1
+            return True
+
+    def acquire(self):
+        with self.condition:
+            while self.running >= int(self.limit):
+                self.condition.wait()
+            self.running += 1
+
+    async def aacquire(self):
+        """ asynchronous variant of acquire, waits without blocking the event loop.
+        """
+        loop = asyncio.get_event_loop()
+        while True:
+            with self.condition:
+                if self.running < int(self.limit):
+                    self.running += 1
+                    return
+                waiter = loop.create_future()
+                self.waiters.append((loop, waiter))
+            try:
+                await waiter
+            finally:
+                with self.condition:
+                    if (loop, waiter) in self.waiters:
+                        self.waiters.remove((loop, waiter))
+
+    def release(self, throttled=False):
+        with self.condition:
+            self.running -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit / 2)
+                log.info('AXL throttled, reduce concurrency to %d' % int(self.limit))
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+            waiters, self.waiters = self.waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # the loop of the waiter is closed
+                pass
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class Throttle(object):
+    """ Pace and retry the AXL calls of a configuration.
+
+    :param rate: Maximum number of calls per second, None for no limit.
+    :param burst: Number of calls that may exceed the rate at once.
+    :param max_concurrency: Maximum number of calls running at the same time, None for no limit.
+    :param retries: Number of retries of a throttled call.
+    :param backoff: Delay in seconds before the first retry, doubled for every further retry.
+    :param max_backoff: Maximum delay in seconds between two retries.
+    :param clock: Monotonic clock of the rate limit.
+    :param sleep: Function used to wait in call.
+    :param asleep: Coroutine function used to wait in acall.
+    """
+
+    def __init__(self, rate=None, burst=None, max_concurrency=None, retries=3, backoff=0.5, max_backoff=30.0,
+                 clock=time.monotonic, sleep=time.sleep, asleep=asyncio.sleep):
+        self.bucket = TokenBucket(rate, burst, clock, sleep) if rate else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency) if max_concurrency else None
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.sleep = sleep
+        self.asleep = asleep
+
+    def delay(self, attempt):
+        """ return the jittered delay before the given retry.
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.5)
+
+    def call(self, name, func, *args, **kwargs):
+        """ call func, waiting for the rate limit and retrying if CUCM throttles it.
+        """
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            if self.concurrency is not None:
+                self.concurrency.acquire()
+            throttled = False
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                throttled = is_throttled(e)
+                if not throttled:
+                    raise
+                attempt = self._retry(name, attempt, e)
+            finally:
+                if self.concurrency is not None:
+                    self.concurrency.release(throttled)
+            self.sleep(self.delay(attempt - 1))
+
+    async def acall(self, name, func, *args, **kwargs):
+        """ asynchronous variant of call, func must return an awaitable.
+        """
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                delay = self.bucket.reserve()
+                if delay:
+                    await self.asleep(delay)
+            if self.concurrency is not None:
+                await self.concurrency.aacquire()
+            throttled = False
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                throttled = is_throttled(e)
+                if not throttled:
+                    raise
+                attempt = self._retry(name, attempt, e)
+            finally:
+                if self.concurrency is not None:
+                    self.concurrency.release(throttled)
+            await self.asleep(self.delay(attempt - 1))
+
+    def _retry(self, name, attempt, error):
+        """ return the number of the next attempt or raise if there are no retries left.
+        """
+        if attempt >= self.retries:
+            raise exceptions.ThrottledException('%s was throttled %d times' % (name, attempt + 1)) from error
+        log.info('%s was throttled, retry %d of %d' % (name, attempt + 1, self.retries))
+        return attempt + 1
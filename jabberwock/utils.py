@@ -1,7 +1,11 @@
 import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from lxml.builder import E
 
 REGEX_UUID = re.compile(r'^\{?([0-9a-f]{8}-(?:[0-9a-f]{4}-){3}[0-9a-f]{12})\}?$')
+REGEX_TOO_LARGE = re.compile(r'Query request too large', re.IGNORECASE)
+REGEX_ROW_FETCH = re.compile(r'Suggestive Row Fetch:\s*less than (\d+)', re.IGNORECASE)
 
 
 def uuid(value):
@@ -27,9 +31,47 @@ def axlbool(value):
     return False
 
 
+def reduced_page_size(fault, page_size):
+    """ return a smaller page size if the fault says that the response was
+        too large, otherwise None.
+        The page size suggested by CUCM is used if there is one.
+    """
+    message = str(getattr(fault, 'message', fault))
+    if not REGEX_TOO_LARGE.search(message):
+        return None
+    match = REGEX_ROW_FETCH.search(message)
+    size = page_size // 2
+    if match:
+        size = min(size, int(match.group(1)) - 1)
+    return size if size > 0 else None
+
+
 def dict_to_elements(dict):
     return [E(k, v) for k, v in dict.items()]
 
 
 def elements_to_dict(elements):
     return {e.tag: e.text for e in elements}
+
+
+def imap_bounded(func, iterable, concurrency=1):
+    """ like map, but calls func in a pool of threads.
+        At most 2 * concurrency calls are pending at the same time and the
+        results are returned in the order of iterable.
+    """
+    if concurrency <= 1:
+        yield from map(func, iterable)
+        return
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    pending = deque()
+    try:
+        for item in iterable:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= 2 * concurrency:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -24,4 +24,5 @@ setup(
     ],
     install_requires=["appdirs", "attrs", "boltons", "cached-property", "certifi", "chardet", "defusedxml", "idna",
                       "isodate", "lxml", "pytz", "requests", "requests-toolbelt", "six", "urllib3", "zeep", "dunamai"],
+    extras_require={"async": ["zeep>=4", "httpx"], "parquet": ["pyarrow"]},
 )
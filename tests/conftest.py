@@ -0,0 +1,40 @@
+import os
+
+import pytest
+from benchmarks.server import FakeAXL
+from jabberwock.axlhandler import AXLClient
+from jabberwock.axlsql import AXLSQL
+from jabberwock.configuration import AXLClientSettings, registry
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'schema')
+VERSION = '12.5'
+
+
+def register(config_name, port, **settings):
+    """ register a configuration for the AXL stand-in at port and create its client.
+    """
+    registry.register(AXLClientSettings(host='127.0.0.1', port=port, username='test', password='test',
+                                        version=VERSION, schema_path=SCHEMA_PATH, **settings), config_name)
+    AXLSQL.instances.clear()
+    return AXLClient.get_client(config_name, recreate=True)
+
+
+@pytest.fixture
+def cucm(monkeypatch):
+    """ start AXL stand-ins of benchmarks/server.py, each with a configuration, e.g. cucm('emea', users=5).
+        Return the FakeAXL, whose users and devices can be changed directly.
+    """
+    # requests prefers a CA bundle from the environment over session.verify = False, the stand-in is self-signed
+    for variable in ('REQUESTS_CA_BUNDLE', 'CURL_CA_BUNDLE'):
+        monkeypatch.delenv(variable, raising=False)
+    servers = list()
+
+    def start(config_name='default', users=20, sql_rows=100, max_rows=None, **settings):
+        fake = FakeAXL(users=users, sql_rows=sql_rows, max_rows=max_rows)
+        servers.append(fake)
+        register(config_name, fake.start(), **settings)
+        return fake
+
+    yield start
+    for fake in servers:
+        fake.stop()
@@ -0,0 +1,198 @@
+import asyncio
+
+import pytest
+from requests.exceptions import ConnectionError
+from zeep.exceptions import Fault
+from benchmarks.server import _fault
+from jabberwock import exceptions
+from jabberwock.ccm.common import Line, User
+
+
+@pytest.fixture
+def fake(cucm):
+    return cucm(users=5)
+
+
+def fail_once(monkeypatch, client):
+    """ make the next AXL call of client fail like a dropped connection.
+    """
+    post = client.transport.post
+    calls = list()
+
+    def flaky(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise ConnectionError('connection reset by peer')
+        return post(*args, **kwargs)
+
+    monkeypatch.setattr(client.transport, 'post', flaky)
+    return calls
+
+
+def record(monkeypatch, fake, operation, fault=None):
+    """ record the requests of an operation of the AXL stand-in.
+        If fault(request) returns a message, the request fails with it.
+    """
+    handler = getattr(fake, operation)
+    requests = list()
+
+    def recording(request):
+        requests.append(request)
+        message = fault(request) if fault is not None else None
+        if message:
+            return 500, _fault(message)
+        return handler(request)
+
+    monkeypatch.setattr(fake, operation, recording)
+    return requests
+
+
+def pages(requests):
+    return [(int(r.findtext('skip')), int(r.findtext('first'))) for r in requests]
+
+
+def test_async_object_refuses_blocking_hydrate(fake):
+    async def load():
+        user = await User.aget(userid='user000001', returns=['firstName'])
+        with pytest.raises(exceptions.BlockingCallException):
+            user.lastName
+        await user.ahydrate()
+        return user
+
+    user = asyncio.run(load())
+    assert (user.firstName, user.lastName, user.__projection__) == ('First1', 'Last1', None)
+
+
+def test_blocking_hydrate_outside_event_loop_or_for_sync_objects(fake):
+    async def load():
+        user = User(userid='user000002', returns=['firstName'])
+        return user, user.lastName, await User.aget(userid='user000003', returns=['firstName'])
+
+    user, last_name, partial = asyncio.run(load())
+    assert last_name == 'Last2'
+    assert partial.lastName == 'Last3'
+
+
+def test_changes_are_renamed_to_update_tags(fake):
+    user = User(userid='user000001')
+    user.userid = 'renamed'
+    user.firstName = user.firstName
+    user.lastName = 'Super'
+    user.primaryExtension = dict(pattern='1000', routePartitionName='PT')
+    user.helper = 'not a tag'
+    assert user._get_changes() == dict(newUserid='renamed', lastName='Super')
+    user.update()
+    assert fake.users[user.uuid]['lastName'] == 'Super'
+
+
+def test_changes_keep_mutable_values_changed_in_place(fake):
+    user = User(userid='user000001')
+    user.associatedDevices = dict(device=['SEP1'])
+    user.update()
+    user.associatedDevices['device'].append('SEP2')
+    user.associatedDevices = user.associatedDevices
+    assert user._get_changes() == dict(associatedDevices=dict(device=['SEP1', 'SEP2']))
+
+
+def test_lazy_object_keeps_criteria_after_failed_load(fake, monkeypatch):
+    user = User.lazy(userid='user000001')
+    calls = fail_once(monkeypatch, user.__client__)
+    with pytest.raises(ConnectionError):
+        user.firstName
+    assert user.firstName == 'First1'
+    assert user.__attached__ and len(calls) == 2
+
+
+def test_failed_hydrate_keeps_object_partial(fake, monkeypatch):
+    user = User(userid='user000001', returns=['firstName'])
+    calls = fail_once(monkeypatch, user.__client__)
+    with pytest.raises(ConnectionError):
+        user.lastName
+    assert user.__projection__ == ['firstName']
+    assert user.lastName == 'Last1' and len(calls) == 2
+
+
+def test_new_and_lazy_apply_defaults(monkeypatch):
+    # the schema of the AXL stand-in has no lines
+    monkeypatch.setattr(Line, '_configure', lambda self, config_name: None)
+    monkeypatch.setattr(Line, '_get_xtype', lambda self, **kwargs: kwargs)
+    assert Line.new(pattern='1000').usage == 'Device'
+    assert Line.lazy(pattern='1000').__pending__ == dict(pattern='1000', usage='Device')
+
+
+def test_iter_reduces_page_size_and_resumes_at_skip(cucm, monkeypatch):
+    fake = cucm(users=20)
+
+    def too_large(request):
+        if pages([request]) == [(10, 10)]:
+            return 'Query request too large. Total rows matched: 10 rows. Suggestive Row Fetch: less than 4 rows'
+
+    requests = record(monkeypatch, fake, 'listUser', too_large)
+    rows = list(User.iter({'lastName': '%'}, ['userid'], page_size=10))
+    assert [row['userid'] for row in rows] == ['user%06d' % i for i in range(20)]
+    assert pages(requests) == [(0, 10), (10, 10), (10, 3), (13, 3), (16, 3), (19, 3)]
+
+
+def test_iter_follows_row_fetch_of_cucm(cucm, monkeypatch):
+    fake = cucm(users=12, max_rows=6)
+    requests = record(monkeypatch, fake, 'listUser')
+    rows = list(User.iter({'lastName': '%'}, ['userid'], page_size=10, form='tuple'))
+    assert [row.userid for row in rows] == ['user%06d' % i for i in range(12)]
+    assert pages(requests) == [(0, 10), (0, 5), (5, 5), (10, 5)]
+
+
+def test_iter_gives_up_without_smaller_page_size(cucm, monkeypatch):
+    fake = cucm(users=5, max_rows=1)
+    requests = record(monkeypatch, fake, 'listUser')
+    with pytest.raises(Fault, match='Query request too large'):
+        list(User.iter({'lastName': '%'}, ['userid'], page_size=4))
+    assert pages(requests) == [(0, 4)]
+
+
+def test_list_obj_builds_objects_from_list(cucm, monkeypatch):
+    fake = cucm(users=3)
+    lists, gets = record(monkeypatch, fake, 'listUser'), record(monkeypatch, fake, 'getUser')
+    users = list(User.list_obj({'lastName': '%'}, returns=['firstName']))
+    assert [(user.uuid, user.firstName) for user in users] == [(uuid, values['firstName'])
+                                                               for (uuid, values) in fake.users.items()]
+    assert [[e.tag for e in r.find('returnedTags')] for r in lists] == [['firstName']]
+    assert gets == []
+    assert users[1].department == 'Department 1' and len(gets) == 1
+
+
+def test_list_obj_gets_tags_list_cannot_return(cucm, monkeypatch):
+    fake = cucm(users=3)
+    lists, gets = record(monkeypatch, fake, 'listUser'), record(monkeypatch, fake, 'getUser')
+    users = list(User.list_obj({'lastName': '%'}, returns=['firstName', 'associatedDevices'], concurrency=2))
+    assert [user.firstName for user in users] == ['First0', 'First1', 'First2']
+    assert [[e.tag for e in r.find('returnedTags')] for r in lists] == [[]]
+    assert sorted(r.findtext('uuid') for r in gets) == sorted(fake.users)
+    assert [[e.tag for e in r.find('returnedTags')] for r in gets] == [['firstName', 'associatedDevices']] * 3
+
+
+def test_bulk_create_captures_errors(cucm, monkeypatch):
+    fake = cucm(users=0)
+    taken = 'Could not insert new row - duplicate value in a UNIQUE INDEX column'
+    record(monkeypatch, fake, 'addUser', lambda r: taken if r.findtext('user/userid') == 'taken' else None)
+    users = [User.new(userid=userid, lastName=userid.title()) for userid in ('first', 'taken', 'third')]
+    results = User.bulk_create(users, concurrency=2)
+    assert [result.obj for result in results] == users
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].exception, Fault) and results[1].uuid is None
+    assert not users[1].__attached__
+    assert sorted(values['userid'] for values in fake.users.values()) == ['first', 'third']
+    assert [results[0].uuid, results[2].uuid] == [users[0].uuid, users[2].uuid]
+
+
+def test_bulk_update_captures_errors(cucm):
+    fake = cucm(users=3)
+    users = list(User.list_obj({'lastName': '%'}, returns=['lastName']))
+    for user in users:
+        user.lastName = 'Bulk'
+    removed = fake.users.pop(users[1].uuid)
+    results = User.bulk_update(users, concurrency=2)
+    assert [(result.ok, result.uuid) for result in results] == [(True, users[0].uuid), (False, None),
+                                                                (True, users[2].uuid)]
+    assert 'was not found' in results[1].exception.message
+    assert [values['lastName'] for values in fake.users.values()] == ['Bulk', 'Bulk']
+    assert removed['lastName'] == 'Last1'
@@ -0,0 +1,26 @@
+import asyncio
+
+from jabberwock.axlhandler import AsyncAXLClient, _running_loop
+
+
+class Client(AsyncAXLClient):
+    """ an AsyncAXLClient without connection, only its registry is used.
+    """
+
+    clients = dict()
+
+    def __init__(self, config_name='default'):
+        self.config_name = config_name
+        self.loop = _running_loop()
+
+
+async def get_twice():
+    return Client.get_client('emea'), Client.get_client('emea')
+
+
+def test_async_client_per_event_loop():
+    first, again = asyncio.run(get_twice())
+    assert first is again and first.loop.is_closed()
+    second, _ = asyncio.run(get_twice())
+    assert second is not first
+    assert list(Client.clients.values()) == [second]
@@ -0,0 +1,74 @@
+import pytest
+from jabberwock.axlsql import AXLSQL, AXLSQLUtils, compile_query, render_query, sql_literal
+
+
+@pytest.mark.parametrize('value, literal', [
+    (None, 'NULL'),
+    (True, "'t'"),
+    (False, "'f'"),
+    (42, '42'),
+    (1.5, '1.5'),
+    ('kent', "'kent'"),
+    ("o'brien", "'o''brien'"),
+    (['a', 1], "'a', 1"),
+])
+def test_sql_literal(value, literal):
+    assert sql_literal(value) == literal
+
+
+@pytest.mark.parametrize('value', [[], '\x00'])
+def test_sql_literal_rejects(value):
+    with pytest.raises(ValueError):
+        sql_literal(value)
+
+
+def test_render_query():
+    sql = render_query('SELECT * FROM enduser WHERE userid = :userid AND pkid IN (:pkids)',
+                       userid="o'brien", pkids=('a', 'b'))
+    assert sql == "SELECT * FROM enduser WHERE userid = 'o''brien' AND pkid IN ('a', 'b')"
+
+
+def test_render_query_skips_quoted_literals_and_casts():
+    template = "SELECT name::lvarchar, 'a:b', \"c:d\", 'it''s :x' FROM device WHERE name = :name"
+    assert compile_query(template)[1] == ('name',)
+    assert render_query(template, name='SEP1') == \
+        "SELECT name::lvarchar, 'a:b', \"c:d\", 'it''s :x' FROM device WHERE name = 'SEP1'"
+
+
+def test_render_query_missing_parameter():
+    with pytest.raises(ValueError):
+        render_query('SELECT * FROM device WHERE name = :name')
+
+
+def record_sql(monkeypatch, fake):
+    """ record the statements sent to the AXL stand-in.
+    """
+    statements = list()
+    execute = fake.executeSQLQuery
+
+    def recording(request):
+        statements.append(request.findtext('sql'))
+        return execute(request)
+
+    monkeypatch.setattr(fake, 'executeSQLQuery', recording)
+    return statements
+
+
+def test_iter_query_skip_first_needs_order_by(cucm, monkeypatch):
+    statements = record_sql(monkeypatch, cucm(sql_rows=25))
+    with pytest.raises(ValueError, match='ORDER BY'):
+        next(AXLSQL.get_instance().iter_query('SELECT pkid FROM device', chunk_size=10))
+    rows = AXLSQL.get_instance().iter_query('SELECT pkid FROM device ORDER BY pkid', chunk_size=10)
+    assert len(list(rows)) == 25
+    assert [sql.split(' pkid')[0] for sql in statements] == ['SELECT SKIP 0 FIRST 10', 'SELECT SKIP 10 FIRST 10',
+                                                             'SELECT SKIP 20 FIRST 10']
+
+
+def test_device_num_plan_map_is_chunked_by_pkid(cucm, monkeypatch):
+    fake = cucm(sql_rows=25)
+    statements = record_sql(monkeypatch, fake)
+    rows = list(AXLSQLUtils.get_instance().get_device_num_plan_map(chunk_size=10))
+    assert [row['pkid'] for row in rows] == [device[0] for device in fake.devices]
+    assert len(statements) == 3
+    assert all(sql.startswith('SELECT FIRST 10 * FROM (SELECT * FROM devicenumplanmap') for sql in statements)
+    assert "WHERE chunk.pkid > '%s' ORDER BY chunk.pkid" % fake.devices[19][0] in statements[2]
@@ -0,0 +1,42 @@
+import pytest
+from jabberwock.cache import MemoryBackend, ModelCache, SqliteBackend
+
+UUID = '{0F0E0D0C-0000-0000-0000-000000000005}'
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def cache(request, tmp_path):
+    if request.param == 'memory':
+        return ModelCache(MemoryBackend())
+    return ModelCache(SqliteBackend(str(tmp_path / 'cache.sqlite')))
+
+
+def test_get_by_uuid_and_alias(cache):
+    cache.set('default', 'User', {'userid': 'user05'}, UUID, b'<user/>')
+    assert cache.get('default', 'User', {'userid': 'user05'}) == b'<user/>'
+    assert cache.get('default', 'User', {'uuid': UUID.strip('{}').lower()}) == b'<user/>'
+    assert cache.get('default', 'User', {'userid': 'user06'}) is None
+    assert cache.get('test', 'User', {'userid': 'user05'}) is None
+
+
+def test_invalidate_removes_aliases(cache):
+    cache.set('default', 'User', {'userid': 'user05'}, UUID, b'<user>old</user>')
+    cache.invalidate('default', 'User', UUID)
+    # the renamed object is fetched again by uuid, the old name must not find it
+    cache.set('default', 'User', {'uuid': UUID}, UUID, b'<user>new</user>')
+    assert cache.get('default', 'User', {'userid': 'user05'}) is None
+    assert cache.get('default', 'User', {'uuid': UUID}) == b'<user>new</user>'
+
+
+def test_alias_without_index_is_ignored(cache):
+    cache.set('default', 'User', {'userid': 'user05'}, UUID, b'<user/>')
+    cache.backend.delete(ModelCache._aliases_key('default', 'User', UUID))
+    assert cache.get('default', 'User', {'userid': 'user05'}) is None
+
+
+def test_several_aliases(cache):
+    cache.set('default', 'User', {'userid': 'user05'}, UUID, b'<user/>')
+    cache.set('default', 'User', {'userid': 'user05', 'returnedTags': 'x'}, UUID, b'<user/>')
+    cache.invalidate('default', 'User', UUID)
+    assert cache.get('default', 'User', {'userid': 'user05'}) is None
+    assert cache.get('default', 'User', {'userid': 'user05', 'returnedTags': 'x'}) is None
@@ -0,0 +1,55 @@
+import pytest
+from benchmarks.server import _uuid
+from jabberwock import exceptions, utils
+from jabberwock.axlsql import AXLSQLUtils
+from jabberwock.ccm import common
+from jabberwock.ccm.common import User, prefetch
+
+
+@pytest.fixture
+def associations(cucm, monkeypatch):
+    """ users 0 to 2 with the users 3 and 4 as their devices, the schema of the AXL stand-in has no phones.
+        Return the keys of every SQL query and the getUser requests.
+    """
+    fake = cucm(users=5)
+    devices = {utils.uuid(_uuid(0)): [_uuid(3), _uuid(4)], utils.uuid(_uuid(1)): [_uuid(4)]}
+    queries = list()
+
+    def query(self, template, keys):
+        queries.append(keys)
+        return [dict(fkenduser=key, fkdevice=utils.uuid(device)) for key in keys for device in devices.get(key, ())]
+
+    monkeypatch.setitem(common.RELATIONS, ('User', 'devices'), ('user_phone_association_many', 'fkdevice', User))
+    monkeypatch.setattr(AXLSQLUtils, 'query', query)
+    monkeypatch.setattr(AXLSQLUtils, 'IN_BATCH_SIZE', 2)
+    gets = list()
+    get_user = fake.getUser
+
+    def get(request):
+        gets.append(request)
+        return get_user(request)
+
+    monkeypatch.setattr(fake, 'getUser', get)
+    return queries, gets
+
+
+def test_prefetch_loads_shared_objects_once(associations):
+    queries, gets = associations
+    users = [User(uuid=_uuid(i)) for i in range(3)]
+    del gets[:]
+    assert prefetch(users, 'devices') == users
+    assert queries == [[utils.uuid(_uuid(0)), utils.uuid(_uuid(1))], [utils.uuid(_uuid(2))]]
+    assert len(gets) == 2
+    devices = [list(user.get_mobility_association()) for user in users]
+    assert [[device.userid for device in objs] for objs in devices] == [['user000003', 'user000004'],
+                                                                        ['user000004'], []]
+    assert devices[0][1] is devices[1][0]
+    assert len(queries) == 2 and len(gets) == 2
+
+
+def test_prefetch_checks_relation_and_objects(associations):
+    with pytest.raises(ValueError, match='no association'):
+        prefetch([User(uuid=_uuid(0))], 'lines')
+    with pytest.raises(exceptions.NotAttachedException):
+        prefetch([User(uuid=_uuid(0)), User.new(userid='new')], 'devices')
+    assert prefetch([], 'devices') == []
@@ -0,0 +1,50 @@
+import json
+import threading
+
+import pytest
+from jabberwock import export
+
+
+def numbers(count, state):
+    try:
+        for i in range(count):
+            yield dict(id=i, name='row%d' % i)
+    finally:
+        state['closed'] = True
+
+
+def test_export_jsonl(tmp_path):
+    path = str(tmp_path / 'rows.jsonl')
+    result = export.export(numbers(25, dict()), path, batch_size=4, queue_size=1)
+    assert (result.rows, result.fields) == (25, ['id', 'name'])
+    with open(path) as f:
+        assert [json.loads(line)['id'] for line in f] == list(range(25))
+
+
+def test_export_raises_error_of_rows(tmp_path):
+    def failing():
+        yield dict(id=1)
+        raise ValueError('broken')
+
+    with pytest.raises(ValueError):
+        export.export(failing(), str(tmp_path / 'rows.csv'), batch_size=1)
+
+
+def test_abandoned_export_stops_producer(tmp_path, monkeypatch):
+    class BrokenWriter(export.CSVWriter):
+        def write(self, rows):
+            raise OSError('disk full')
+
+    monkeypatch.setitem(export.WRITERS, 'csv', BrokenWriter)
+    state = dict()
+    with pytest.raises(OSError):
+        export.export(numbers(10000, state), str(tmp_path / 'rows.csv'), batch_size=10, queue_size=1)
+    assert state['closed']
+
+
+def test_lost_producer_does_not_block():
+    producer = threading.Thread(target=lambda: None)
+    producer.start()
+    producer.join()
+    with pytest.raises(RuntimeError):
+        export._next_batch(export.queue.Queue(), producer)
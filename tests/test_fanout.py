@@ -0,0 +1,37 @@
+from requests.exceptions import ConnectionError
+from zeep.exceptions import Fault
+from jabberwock import fanout
+from jabberwock.ccm.common import User
+from conftest import register
+
+
+def test_get_all_sorts_faults_into_errors(cucm):
+    cucm('emea', users=5)
+    cucm('amer', users=0)
+    register('apac', port=1)
+    emea, amer, apac = fanout.get_all(User, ['emea', 'amer', 'apac'], userid='user000001')
+    assert emea.ok and emea.value.firstName == 'First1' and emea.value.__attached__
+    assert amer.ok and amer.value is None
+    assert not apac.ok and isinstance(apac.exception, ConnectionError)
+    assert fanout.found([emea, amer, apac]) == [emea]
+
+
+def test_get_all_by_uuid_in_every_cluster(cucm):
+    uuid = next(iter(cucm('emea', users=2).users))
+    cucm('amer', users=2)
+    results = fanout.get_all(User, ['emea', 'amer'], uuid=uuid)
+    assert [result.value.uuid for result in results] == [uuid, uuid]
+
+
+def test_list_all_columns_rows(cucm):
+    cucm('emea', users=2)
+    cucm('amer', users=1)
+    results = fanout.list_all(User, dict(userid='%'), ['userid'], ['emea', 'amer'], form='columns')
+    assert list(fanout.rows(results)) == [('emea', dict(userid='user000000')), ('emea', dict(userid='user000001')),
+                                          ('amer', dict(userid='user000000'))]
+
+
+def test_rows_skips_failed_results():
+    results = [fanout.ClusterResult('emea', value=[dict(name='SEP1')]),
+               fanout.ClusterResult('apac', exception=Fault('down'))]
+    assert list(fanout.rows(results)) == [('emea', dict(name='SEP1'))]
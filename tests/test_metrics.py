@@ -0,0 +1,39 @@
+import pytest
+from jabberwock.metrics import CallMetrics, MemoryCollector, percentile
+
+
+@pytest.mark.parametrize('values, p, expected', [
+    (list(range(1, 11)), 50, 5),
+    (list(range(1, 11)), 90, 9),
+    (list(range(1, 11)), 100, 10),
+    (list(range(1, 11)), 0, 1),
+    (list(range(1, 101)), 99, 99),
+    (list(range(1, 101)), 1, 1),
+    ([7], 50, 7),
+    ([1, 2], 50, 1),
+    ([1, 2], 51, 2),
+    ([], 50, None),
+])
+def test_percentile_nearest_rank(values, p, expected):
+    assert percentile(values, p) == expected
+
+
+def _call(operation, request_bytes, response_bytes, total_time):
+    call = CallMetrics('default', operation)
+    call.request_bytes = request_bytes
+    call.response_bytes = response_bytes
+    call.total_time = total_time
+    return call
+
+
+def test_summary_keeps_byte_totals():
+    collector = MemoryCollector(percentiles=(50, 90))
+    for i in range(1, 11):
+        collector.record(_call('getUser', 100, 1000 * i, i / 10.0))
+    summary = collector.summary()[('default', 'getUser')]
+    assert summary['calls'] == 10
+    assert summary['request_bytes'] == 1000
+    assert summary['response_bytes'] == 55000
+    assert summary['percentiles']['response_bytes'] == {50: 5000, 90: 9000}
+    assert summary['percentiles']['total_time'] == {50: 0.5, 90: 0.9}
+    assert collector.counters()[('default', 'getUser')]['response_bytes'] == 55000
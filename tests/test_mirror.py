@@ -0,0 +1,63 @@
+import pytest
+from benchmarks.server import _fault, _uuid
+from jabberwock.ccm.common import User
+from jabberwock.mirror import Mirror
+
+FIELDS = ['userid', 'firstName']
+
+
+@pytest.fixture
+def fake(cucm):
+    return cucm(users=50)
+
+
+@pytest.fixture
+def mirror(fake, tmp_path):
+    with Mirror(str(tmp_path / 'mirror.db')) as mirror:
+        yield mirror
+
+
+def remove_user(fake, i):
+    fake.userids.pop(fake.users.pop(_uuid(i))['userid'])
+
+
+def test_sync_is_incremental(fake, mirror):
+    assert len(mirror.sync(User, dict(userid='%'), FIELDS).added) == 50
+    fake.users[_uuid(3)]['firstName'] = 'Changed'
+    remove_user(fake, 4)
+    result = mirror.sync(User, dict(userid='%'), FIELDS)
+    assert (result.added, result.changed, result.removed, result.unchanged) == ([], [_uuid(3)], [_uuid(4)], 48)
+    assert mirror.get('User', _uuid(3))['firstName'] == 'Changed'
+    assert mirror.get('User', _uuid(3))['lastName'] == 'Last3'
+    assert mirror.get('User', _uuid(4)) is None
+
+
+def test_narrower_criteria_does_not_remove_other_objects(fake, mirror):
+    mirror.sync(User, dict(userid='%'), FIELDS)
+    result = mirror.sync(User, dict(userid='user00001%'), FIELDS)
+    assert (result.added, result.removed, result.unchanged) == ([], [], 10)
+    assert len(list(mirror.all('User'))) == 50
+    remove_user(fake, 40)
+    remove_user(fake, 11)
+    result = mirror.sync(User, dict(userid='user00001%'), FIELDS)
+    # the sync of all users still holds both
+    assert (result.removed, result.unchanged) == ([], 9)
+    assert mirror.get('User', _uuid(11)) is not None
+    assert mirror.sync(User, dict(userid='%'), FIELDS).removed == sorted([_uuid(11), _uuid(40)])
+    assert mirror.get('User', _uuid(11)) is None
+    assert len(list(mirror.all('User'))) == 48
+
+
+def test_failed_fetch_is_not_a_removal(fake, mirror, monkeypatch):
+    mirror.sync(User, dict(userid='%'), FIELDS)
+    fake.users[_uuid(3)]['firstName'] = 'Changed'
+    fake.users[_uuid(99)] = dict(fake.users[_uuid(5)], userid='user000099', firstName='New')
+    fake.userids['user000099'] = _uuid(99)
+    with monkeypatch.context() as patch:
+        patch.setattr(fake, 'getUser', lambda request: (500, _fault('Database error')), raising=False)
+        result = mirror.sync(User, dict(userid='%'), FIELDS)
+    assert (result.added, result.changed, result.removed) == ([], [], [])
+    assert sorted(result.failed) == sorted([_uuid(3), _uuid(99)])
+    assert mirror.get('User', _uuid(3))['firstName'] == 'First3'
+    result = mirror.sync(User, dict(userid='%'), FIELDS)
+    assert (result.added, result.changed, result.failed) == ([_uuid(99)], [_uuid(3)], [])
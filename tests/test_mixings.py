@@ -0,0 +1,49 @@
+from collections import OrderedDict
+
+import pytest
+from jabberwock.ccm.common import User
+from jabberwock.ccm.mixings import MixingAbstractTemplate
+
+
+@pytest.fixture
+def fetched(cucm, monkeypatch):
+    """ count the getUser calls of the AXL stand-in.
+    """
+    fake = cucm(users=5)
+    calls = list()
+    get_user = fake.getUser
+
+    def count(request):
+        calls.append(request.findtext('userid'))
+        return get_user(request)
+
+    monkeypatch.setattr(fake, 'getUser', count, raising=False)
+    monkeypatch.setattr(MixingAbstractTemplate, '__skeletons__', OrderedDict())
+    monkeypatch.setattr(MixingAbstractTemplate, 'SKELETONS_SIZE', 2)
+    return calls
+
+
+def test_expand_fetches_template_once(fetched):
+    users = list(User.expand([dict(userid='new1'), dict(userid='new2')], userid='user000001'))
+    assert [(user.userid, user.lastName, user.__attached__) for user in users] == [('new1', 'Last1', False),
+                                                                                  ('new2', 'Last1', False)]
+    list(User.expand([dict(userid='new3')], userid='user000001'))
+    assert fetched == ['user000001']
+
+
+def test_expand_with_unhashable_criteria(fetched):
+    for _ in range(2):
+        list(User.expand([dict(userid='new1')], userid='user000001', returns=['lastName']))
+    assert len(fetched) == 1
+    for _ in range(2):
+        list(User.expand([dict(userid='new1')], userid='user000001', returns={'lastName'}))
+    assert len(fetched) == 3
+
+
+def test_expand_cache_is_bounded(fetched):
+    for userid in ('user000001', 'user000002', 'user000001', 'user000003', 'user000001'):
+        list(User.expand([], userid=userid))
+    assert fetched == ['user000001', 'user000002', 'user000003']
+    assert len(MixingAbstractTemplate.__skeletons__) == 2
+    list(User.expand([], userid='user000002'))
+    assert fetched[-1] == 'user000002'
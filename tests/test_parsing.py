@@ -0,0 +1,92 @@
+from jabberwock import parsing
+
+HEAD = b'<Envelope><Body><listUserResponse><return>'
+TAIL = b'</return></listUserResponse></Body></Envelope>'
+
+
+def response(count):
+    return HEAD + b''.join(b'<row><pkid>%d</pkid></row>' % i for i in range(count)) + TAIL
+
+
+def pkids(chunks):
+    return [row['pkid'] for chunk in chunks for row in parsing.iter_sql_rows(chunk)]
+
+
+def test_split_rows_keeps_envelope_and_order():
+    content = response(100)
+    chunks = parsing.split_rows(content, 'row', size=200)
+    assert len(chunks) > 1
+    assert all(chunk.startswith(HEAD) and chunk.endswith(TAIL) for chunk in chunks)
+    assert pkids(chunks) == [str(i) for i in range(100)]
+
+
+def test_split_rows_small_response_is_not_split():
+    content = response(3)
+    assert parsing.split_rows(content, 'row') == [content]
+
+
+def test_split_rows_reads_chunk_size_at_call_time(monkeypatch):
+    content = response(100)
+    monkeypatch.setattr(parsing, 'CHUNK_SIZE', 500)
+    assert len(parsing.split_rows(content, 'row')) > 1
+
+
+def test_split_rows_only_at_row_boundaries():
+    content = HEAD + b''.join(b'<row><name>r%d</name><rows>x</rows></row>' % i for i in range(50)) + TAIL
+    chunks = parsing.split_rows(content, 'row', size=100)
+    assert len(chunks) > 1
+    assert [row['name'] for chunk in chunks for row in parsing.iter_sql_rows(chunk)] == ['r%d' % i for i in range(50)]
+
+
+class Deferred(object):
+    """ a future of Pool, the chunk is parsed when its result is taken.
+    """
+
+    def __init__(self, pool, func, args):
+        self.pool, self.func, self.args = pool, func, args
+
+    def result(self):
+        self.pool.running -= 1
+        return self.func(*self.args)
+
+    def cancel(self):
+        self.pool.cancelled += 1
+
+
+class Pool(object):
+    """ a process pool stand-in which counts the chunks submitted but not yet taken.
+    """
+
+    def __init__(self):
+        self.running = self.most = self.cancelled = 0
+
+    def submit(self, func, *args):
+        self.running += 1
+        self.most = max(self.most, self.running)
+        return Deferred(self, func, args)
+
+
+def test_iter_rows_parallel_bounds_submitted_chunks(monkeypatch):
+    pool = Pool()
+    monkeypatch.setattr(parsing, 'get_pool', lambda processes: pool)
+    monkeypatch.setattr(parsing, 'CHUNK_SIZE', 100)
+    content = response(200)
+    rows = parsing.iter_rows_parallel(content, 'row', None, processes=2)
+    assert [row['pkid'] for row in rows] == [str(i) for i in range(200)]
+    assert len(parsing.split_rows(content, 'row')) > 20
+    assert pool.most == 4 and pool.running == 0
+
+
+def test_iter_rows_parallel_cancels_pending_chunks(monkeypatch):
+    pool = Pool()
+    monkeypatch.setattr(parsing, 'get_pool', lambda processes: pool)
+    monkeypatch.setattr(parsing, 'CHUNK_SIZE', 100)
+    rows = parsing.iter_rows_parallel(response(200), 'row', ['pkid'], processes=2)
+    assert next(rows) == ['0']
+    rows.close()
+    assert pool.cancelled == 3
+
+
+def test_iter_rows_parallel_small_response_without_pool(monkeypatch):
+    monkeypatch.setattr(parsing, 'get_pool', None)
+    assert list(parsing.iter_rows_parallel(response(3), 'row', ['pkid'], processes=2)) == [['0'], ['1'], ['2']]
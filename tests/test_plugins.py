@@ -0,0 +1,26 @@
+import pytest
+from jabberwock.axlhandler import AXLClient
+from jabberwock.ccm.common import User
+from jabberwock.plugins import create_plugins
+
+
+def test_summary_counts_rows_only_by_default(cucm):
+    cucm(users=3, transport_debugger='summary')
+    User.list(dict(userid='%'), ['userid'])
+    last = AXLClient.get_client().history.last
+    assert (last['operation'], last['response_rows']) == ('listUser', 3)
+    assert last['response_bytes'] > 0 and 'response_elements' not in last
+
+
+def test_summary_counts_elements_when_asked(cucm):
+    cucm(users=3, transport_debugger='summary_elements')
+    User.list(dict(userid='%'), ['userid'])
+    last = AXLClient.get_client().history.last
+    # Envelope, Body, listUserResponse, return and a user with its userid per row
+    assert (last['response_rows'], last['response_elements']) == (3, 10)
+    assert last['request_elements'] > 0
+
+
+def test_unknown_transport_debugger():
+    with pytest.raises(ValueError):
+        create_plugins('verbose')
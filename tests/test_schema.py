@@ -0,0 +1,83 @@
+import os
+import shutil
+from types import SimpleNamespace
+
+import pytest
+from jabberwock import schema
+from jabberwock.axlhandler import AXLClient
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'schema')
+VERSION = '12.5'
+
+supported = pytest.mark.skipif(not schema.snapshot_supported(), reason='schema snapshots are not supported')
+
+
+@pytest.fixture
+def schema_path(tmp_path):
+    shutil.copytree(os.path.join(SCHEMA_PATH, VERSION), str(tmp_path / VERSION))
+    return str(tmp_path)
+
+
+@supported
+def test_compile_and_load(schema_path):
+    document = schema.compile_schema(schema_path, VERSION)
+    loaded = schema.load_schema(schema_path, VERSION)
+    assert set(loaded.bindings) == set(document.bindings)
+
+
+@supported
+def test_stale_snapshot(schema_path):
+    schema.compile_schema(schema_path, VERSION)
+    with open(os.path.join(schema_path, VERSION, 'axlSoap.xsd'), 'a') as fp:
+        fp.write('\n')
+    assert schema.load_schema(schema_path, VERSION) is None
+
+
+@supported
+@pytest.mark.parametrize('size', [0, 10, 0.5, -10])
+def test_truncated_snapshot(schema_path, size):
+    schema.compile_schema(schema_path, VERSION)
+    path = schema.default_snapshot_path(schema_path, VERSION)
+    with open(path, 'rb') as fp:
+        data = fp.read()
+    with open(path, 'wb') as fp:
+        fp.write(data[:int(len(data) * size)] if isinstance(size, float) else data[:size])
+    assert schema.load_schema(schema_path, VERSION) is None
+
+
+def test_missing_snapshot(schema_path):
+    assert schema.load_schema(schema_path, VERSION) is None
+
+
+def test_unsupported_versions(monkeypatch):
+    monkeypatch.setattr(schema, 'zeep_version', lambda: (3, 3))
+    assert not schema.snapshot_supported()
+    with pytest.raises(RuntimeError):
+        schema.compile_schema(SCHEMA_PATH, VERSION)
+
+
+@supported
+def test_unwritable_snapshot_parses_once(schema_path, monkeypatch):
+    parsed = list()
+
+    def document(*args, **kwargs):
+        parsed.append(args[0])
+        return Document(*args, **kwargs)
+
+    Document = schema.Document
+    monkeypatch.setattr(schema, 'Document', document)
+    client = AXLClient.__new__(AXLClient)
+    client.config = SimpleNamespace(schema_path=schema_path, version=VERSION, zeep_settings=None,
+                                    schema_snapshot=os.path.join(schema_path, 'missing', 'AXLAPI.snapshot'))
+    loaded = client._load_wsdl(None)
+    assert isinstance(loaded, Document) and len(parsed) == 1
+
+
+@supported
+def test_client_keeps_zeep_get_type(schema_path):
+    document = schema.compile_schema(schema_path, VERSION)
+    client = AXLClient.__new__(AXLClient)
+    client.wsdl = document
+    client.types = dict()
+    client.factory = client.type_factory(AXLClient.XSD_NS)
+    assert client.get_type('ns0:XUser').name == client.lookup_type('XUser').name == 'XUser'
@@ -0,0 +1,191 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from zeep.exceptions import Fault, TransportError
+
+from jabberwock import throttle
+from jabberwock.exceptions import ThrottledException
+from jabberwock.throttle import AdaptiveConcurrency, Throttle, TokenBucket, is_throttled
+
+
+class Clock(object):
+    """ a clock which only moves when the tests sleep.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+    async def asleep(self, seconds):
+        self.sleep(seconds)
+
+
+def failing(*errors, result='ok'):
+    """ return a callable which raises the errors one after another and then returns result.
+    """
+    errors = list(errors)
+    calls = []
+
+    def func(*args, **kwargs):
+        calls.append((args, kwargs))
+        if errors:
+            raise errors.pop(0)
+        return result
+    func.calls = calls
+    return func
+
+
+def afailing(*errors, result='ok'):
+    func = failing(*errors, result=result)
+
+    async def afunc(*args, **kwargs):
+        return func(*args, **kwargs)
+    afunc.calls = func.calls
+    return afunc
+
+
+@pytest.fixture
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(throttle, 'random', SimpleNamespace(uniform=lambda a, b: 1.0))
+
+
+def test_is_throttled():
+    assert is_throttled(TransportError(status_code=503))
+    assert is_throttled(TransportError(status_code=429))
+    assert not is_throttled(TransportError(status_code=500))
+    assert is_throttled(Fault('Maximum AXL Memory Allocation Consumed'))
+    assert is_throttled(Fault('AXL request throttled'))
+    assert not is_throttled(Fault('Item not valid: The specified User was not found'))
+    assert not is_throttled(ValueError('throttled'))
+
+
+def test_token_bucket():
+    clock = Clock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock, sleep=clock.sleep)
+    assert [bucket.reserve(), bucket.reserve()] == [0.0, 0.0]
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+    clock.now += 1.0
+    assert bucket.reserve() == 0.5
+    clock.now += 10
+    assert [bucket.reserve(), bucket.reserve(), bucket.reserve()] == [0.0, 0.0, 0.5]
+
+
+def test_token_bucket_acquire_sleeps():
+    clock = Clock()
+    bucket = TokenBucket(rate=4, burst=1, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.slept == [0.25, 0.25]
+
+
+def test_concurrency_aimd():
+    concurrency = AdaptiveConcurrency(maximum=8, minimum=2)
+    for _ in range(8):
+        assert concurrency.try_acquire()
+    assert not concurrency.try_acquire()
+    concurrency.release(throttled=True)
+    assert concurrency.limit == 4
+    assert not concurrency.try_acquire()
+    for _ in range(4):
+        concurrency.release(throttled=True)
+    assert concurrency.limit == 2
+    for _ in range(3):
+        concurrency.release()
+    assert concurrency.running == 0
+    assert concurrency.limit == pytest.approx(2 + 1 / 2 + 1 / 2.5 + 1 / 2.9)
+    for _ in range(100):
+        concurrency.try_acquire()
+        concurrency.release()
+    assert concurrency.limit == 8
+
+
+def test_call_retries_throttled(no_jitter):
+    clock = Clock()
+    limiter = Throttle(max_concurrency=4, retries=3, backoff=0.5, sleep=clock.sleep)
+    func = failing(TransportError(status_code=503), Fault('throttled'))
+    assert limiter.call('getUser', func, 1, userid='a') == 'ok'
+    assert func.calls == [((1,), {'userid': 'a'})] * 3
+    assert clock.slept == [0.5, 1.0]
+    assert limiter.concurrency.running == 0
+    assert limiter.concurrency.limit == 1 + 1 / 1
+
+
+def test_call_raises_throttled_exception(no_jitter):
+    clock = Clock()
+    limiter = Throttle(retries=2, backoff=20, max_backoff=30, sleep=clock.sleep)
+    error = Fault('throttled')
+    func = failing(*[error] * 3)
+    with pytest.raises(ThrottledException, match='getUser was throttled 3 times') as info:
+        limiter.call('getUser', func)
+    assert info.value.__cause__ is error
+    assert clock.slept == [20, 30]
+
+
+def test_call_does_not_retry_other_errors():
+    clock = Clock()
+    limiter = Throttle(max_concurrency=2, sleep=clock.sleep)
+    with pytest.raises(Fault):
+        limiter.call('getUser', failing(Fault('was not found')))
+    assert clock.slept == []
+    assert limiter.concurrency.running == 0
+    assert limiter.concurrency.limit == 2
+
+
+def test_delay_jitter(monkeypatch):
+    monkeypatch.setattr(throttle, 'random', SimpleNamespace(uniform=lambda a, b: b))
+    limiter = Throttle(backoff=1, max_backoff=5)
+    assert [limiter.delay(attempt) for attempt in range(4)] == [1.5, 3.0, 6.0, 7.5]
+
+
+def test_acall_retries_throttled(no_jitter):
+    clock = Clock()
+    limiter = Throttle(rate=1, burst=1, retries=3, backoff=0.5, clock=clock, asleep=clock.asleep)
+    func = afailing(Fault('throttled'), Fault('throttled'))
+    assert asyncio.run(limiter.acall('getUser', func, 1)) == 'ok'
+    assert len(func.calls) == 3
+    # backoff and the rate limit of the retries
+    assert clock.slept == [0.5, 0.5, 1.0]
+
+
+def test_acall_raises_throttled_exception(no_jitter):
+    clock = Clock()
+    limiter = Throttle(retries=1, asleep=clock.asleep)
+    with pytest.raises(ThrottledException, match='was throttled 2 times'):
+        asyncio.run(limiter.acall('getUser', afailing(*[TransportError(status_code=429)] * 2)))
+    assert clock.slept == [0.5]
+
+
+def test_acall_waits_for_release():
+    limiter = Throttle(max_concurrency=1)
+    order = []
+
+    async def call(name, event):
+        order.append('start %s' % name)
+        await event.wait()
+        order.append('end %s' % name)
+        return name
+
+    async def main():
+        first, second = asyncio.Event(), asyncio.Event()
+        tasks = [asyncio.ensure_future(limiter.acall('first', call, 'first', first)),
+                 asyncio.ensure_future(limiter.acall('second', call, 'second', second))]
+        await asyncio.sleep(0)
+        assert order == ['start first']
+        assert len(limiter.concurrency.waiters) == 1
+        second.set()
+        first.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(main()) == ['first', 'second']
+    assert order == ['start first', 'end first', 'start second', 'end second']
+    assert limiter.concurrency.running == 0
+    assert limiter.concurrency.waiters == []